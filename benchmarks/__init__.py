@@ -0,0 +1 @@
+"""This package contains performance benchmarks of labyrinth algorithms"""
@@ -0,0 +1,52 @@
+"""
+    This module measures cold start time of the command line interface compared to the interactive shell
+    Every command runs in a fresh interpreter, best and median wall times are reported
+    Usage: python -m benchmarks.cold_start [runs]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(command: list[str], runs: int, stdin: bytes = b'') -> tuple[float, float]:
+    """Runs command in a fresh interpreter, returns best and median seconds"""
+    times = []
+
+    for _ in range(runs):
+        begin = perf_counter()
+        subprocess.run(command, input=stdin, stdout=subprocess.DEVNULL, cwd=ROOT_PATH, check=True)
+        times.append(perf_counter() - begin)
+
+    return min(times), median(times)
+
+
+def run(runs: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lab_path = os.path.join(temp_dir, 'bench.lab')
+        subprocess.run([sys.executable, '-m', 'src', 'generate', '10', '10', '--seed', '1', '-o', lab_path],
+                       cwd=ROOT_PATH, check=True)
+
+        cases = {
+            'python': ([sys.executable, '-c', 'pass'], b''),
+            'shell exit': ([sys.executable, 'shell_labyrinth.py'], b'exit\n'),
+            'cli --help': ([sys.executable, '-m', 'src', '--help'], b''),
+            'cli generate': ([sys.executable, '-m', 'src', 'generate', '10', '10'], b''),
+            'cli generate binary': ([sys.executable, '-m', 'src', 'generate', '10', '10', '--algo', 'binary'], b''),
+            'cli solve': ([sys.executable, '-m', 'src', 'solve', lab_path], b''),
+            'cli render': ([sys.executable, '-m', 'src', 'render', lab_path], b''),
+            'cli stats': ([sys.executable, '-m', 'src', 'stats', lab_path], b''),
+        }
+
+        for name, (command, stdin) in cases.items():
+            best, middle = measure(command, runs, stdin)
+            print(f'{name}: best {best * 1000:.1f} ms, median {middle * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    run(*(int(arg) for arg in sys.argv[1:2]))
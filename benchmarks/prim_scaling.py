@@ -0,0 +1,30 @@
+"""
+    This module measures PrimGenerator scaling on square labyrinths
+    Usage: python -m benchmarks.prim_scaling [side ...]
+"""
+
+import sys
+from time import perf_counter
+
+from src.generator import PrimGenerator
+
+DEFAULT_SIDES = (100, 250, 500, 1000, 2000)
+
+
+def run(sides: tuple[int, ...] = DEFAULT_SIDES) -> list[tuple[int, float]]:
+    """Generates labyrinth for every side length, returns (cells, seconds) pairs"""
+    results = []
+
+    for side in sides:
+        begin = perf_counter()
+        PrimGenerator(side, side).generate()
+        elapsed = perf_counter() - begin
+
+        results.append((side * side, elapsed))
+        print(f'{side}x{side}: {elapsed:.3f} s, {elapsed / (side * side) * 1e6:.3f} us/cell', flush=True)
+
+    return results
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or DEFAULT_SIDES)
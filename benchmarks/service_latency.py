@@ -0,0 +1,59 @@
+"""
+    This module measures latency of the labyrinth service under concurrent clients
+    Usage: python -m benchmarks.service_latency [clients] [requests per client] [side]
+"""
+
+import asyncio
+import http.client
+import json
+import sys
+import tempfile
+import threading
+from time import perf_counter
+
+from src.service import LabService
+
+
+def run_clients(port: int, clients: int, requests: int, side: int) -> list[float]:
+    """Runs clients sending generate requests over keep-alive connections, returns sorted latencies"""
+    latencies = []
+
+    def client(number: int) -> None:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+
+        for i in range(requests):
+            begin = perf_counter()
+            connection.request('POST', '/generate',
+                               json.dumps({'width': side, 'height': side, 'seed': number * requests + i}))
+            connection.getresponse().read()
+            latencies.append(perf_counter() - begin)
+
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return sorted(latencies)
+
+
+async def run(clients: int = 8, requests: int = 50, side: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as save_dir:
+        service = LabService(save_dir, port=0)
+        await service.start()
+
+        begin = perf_counter()
+        latencies = await asyncio.to_thread(run_clients, service.port, clients, requests, side)
+        elapsed = perf_counter() - begin
+
+        await service.close()
+
+    print(f'{len(latencies)} requests of {side}x{side} by {clients} clients: {len(latencies) / elapsed:.0f} req/s, '
+          f'p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:4])))
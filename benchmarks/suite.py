@@ -0,0 +1,152 @@
+"""
+    This module measures the whole labyrinth pipeline across a ladder of square labyrinth sizes:
+    every generation algorithm of the shell registry, every solving strategy, analytics, csv and lab load/save
+    and rendering into an in-memory buffer as text and image
+    Results are written to JSON, comparing them with a stored baseline fails on regressions
+    Usage: python -m benchmarks.suite [--sides N ...] [--repeat R] [--output FILE]
+                                      [--baseline FILE] [--threshold T]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Callable
+
+from shell_labyrinth import generate
+from src.analytics import analyze
+from src.entities import Labyrinth
+from src.generator import DFSGenerator
+from src.generator import Solver
+from src.image import ImageExporter
+from src.loader import Loader
+from src.printer import Printer
+
+DEFAULT_SIDES = (50, 100, 200, 400)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+SEED = 1
+
+"""Timings below this number of seconds are too noisy to be compared with baseline"""
+MIN_SECONDS = 0.005
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'conf')
+
+
+def measure(action: Callable[[], object], repeat: int) -> dict:
+    """Runs action repeat times, returns best and mean time in seconds and peak traced memory in bytes"""
+    timings = []
+
+    for _ in range(repeat):
+        begin = perf_counter()
+        action()
+        timings.append(perf_counter() - begin)
+
+    """Memory is traced in a separate run, so tracing overhead does not affect timings"""
+    tracemalloc.start()
+    action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'best': min(timings), 'mean': sum(timings) / len(timings), 'peak': peak}
+
+
+def get_cases(side: int, labyrinth: Labyrinth, loader: Loader) -> dict[str, Callable[[], object]]:
+    """Returns named actions measured on the labyrinth of the given side"""
+    conf, styles = Loader(CONF_PATH).load_json('conf'), Loader(CONF_PATH).load_json('styles')
+    cases = {}
+
+    for algo, generator in generate.items():
+        cases[f'generate/{algo}'] = generator(side, side, SEED).generate
+
+    cases['generate/dfs/farthest'] = DFSGenerator(side, side, SEED, 'farthest').generate
+
+    for strategy in Solver.strategies:
+        cases[f'solve/{strategy}'] = lambda solver=Solver(strategy, SEED): solver.solve(labyrinth)
+
+    cases['analyze'] = lambda: analyze(labyrinth)
+
+    name = f'bench_{side}'
+    cases['save/csv'] = lambda: loader.save_labyrinth_csv(labyrinth, name)
+    cases['load/csv'] = lambda: loader.load_labyrinth_csv(name)
+    cases['save/lab'] = lambda: loader.save_labyrinth_lab(labyrinth, name)
+    cases['load/lab'] = lambda: loader.load_labyrinth_lab(name)
+
+    solution = Solver('bfs').solve(labyrinth)
+    cases['render'] = lambda: Printer(labyrinth, conf, styles).print_labyrinth(io.StringIO())
+    cases['render/solution'] = lambda: Printer(labyrinth, conf, styles, solution).print_labyrinth(io.StringIO())
+    cases['image/pbm'] = lambda: ImageExporter(labyrinth, solution=solution).write(io.BytesIO(), 'pbm')
+    cases['image/png'] = lambda: ImageExporter(labyrinth, solution=solution).write(io.BytesIO(), 'png')
+
+    return cases
+
+
+def run(sides: tuple[int, ...] = DEFAULT_SIDES, repeat: int = DEFAULT_REPEAT) -> dict:
+    """Measures every case for every side length, returns results keyed by case name and labyrinth size"""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        loader = Loader(save_dir)
+
+        for side in sides:
+            labyrinth = DFSGenerator(side, side, SEED).generate()
+
+            for case, action in get_cases(side, labyrinth, loader).items():
+                key = f'{case}@{side}x{side}'
+                results[key] = measure(action, repeat)
+                print(f'{key}: {results[key]["best"]:.4f} s, peak {results[key]["peak"] / 1024:.1f} KiB', flush=True)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns descriptions of cases which best time exceeds baseline by more than threshold share"""
+    regressions = []
+
+    for key, result in results.items():
+        if key not in baseline or max(result['best'], baseline[key]['best']) < MIN_SECONDS:
+            continue
+
+        change = result['best'] / baseline[key]['best'] - 1
+
+        if change > threshold:
+            regressions.append(f'{key}: {baseline[key]["best"]:.4f} s -> {result["best"]:.4f} s (+{change:.0%})')
+
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='Labyrinth pipeline benchmarks')
+    parser.add_argument('--sides', type=int, nargs='+', default=DEFAULT_SIDES, help='square labyrinth sides')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed runs of every case')
+    parser.add_argument('--output', help='JSON file results are written to')
+    parser.add_argument('--baseline', help='JSON file with results to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown share relative to baseline')
+    args = parser.parse_args(argv)
+
+    results = run(tuple(args.sides), args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+
+        if regressions:
+            print('Regressions:', *regressions, sep='\n* ')
+            return 1
+
+        print('No regressions found')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
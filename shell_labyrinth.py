@@ -4,18 +4,31 @@ import os
 import re
 import json
 from termcolor import COLORS
-from datetime import datetime
+from time import perf_counter
 from cmd import Cmd
 
+from src.analytics import analyze
+from src.animator import Animator
 from src.entities import Labyrinth
 from src.generator import DFSGenerator
 from src.generator import WilsonGenerator
 from src.generator import PrimGenerator
+from src.generator import EllerGenerator
 from src.generator import Solver
+from src.batch import BatchGenerator
+from src.cache import LabyrinthCache
+from src.editor import LabyrinthEditor
+from src.image import ImageExporter
+from src.index import TreeIndex
+from src.vectorized import BinaryTreeGenerator
+from src.vectorized import SidewinderGenerator
 from src.loader import Loader
 from src.printer import Printer
+from src.stats import stats
+from src.tiled import TiledGenerator
 
-generate = {'dfs': DFSGenerator, 'wilson': WilsonGenerator, 'prim': PrimGenerator}
+generate = {'dfs': DFSGenerator, 'wilson': WilsonGenerator, 'prim': PrimGenerator,
+            'eller': EllerGenerator, 'binary': BinaryTreeGenerator, 'sidewinder': SidewinderGenerator}
 
 
 class LabCmd(Cmd):
@@ -24,10 +37,16 @@ class LabCmd(Cmd):
 
     curr_labyrinth: Labyrinth = None
     curr_name: str = None
+    curr_index: TreeIndex = None
+    curr_key: tuple = None
+    curr_editor: LabyrinthEditor = None
+    instrumented = {'generate', 'generate_batch', 'generate_tiled', 'stream', 'animate',
+                    'solve', 'edit', 'route', 'show', 'save', 'load', 'view', 'export'}
     conf: dict = None
     style: dict = None
     solver = Solver()
     lab_loader = Loader(os.path.join(os.path.dirname(__file__), 'maps'))
+    cache = LabyrinthCache()
 
     def __init__(self):
         self.conf = Loader(os.path.join(os.path.dirname(__file__), 'conf')).load_json('conf')
@@ -39,8 +58,13 @@ class LabCmd(Cmd):
         """This method provides generate command"""
 
         split_args = re.split(r'\s+', args)
+        finish = 'random'
 
         try:
+            if len(split_args) > 4 and split_args[-2] == '--finish':
+                finish = split_args[-1]
+                split_args = split_args[:-2]
+
             if len(split_args) == 3:
                 split_args.append('dfs')
             elif len(split_args) < 3:
@@ -48,17 +72,22 @@ class LabCmd(Cmd):
                 return False
 
             x_bound, y_bound = int(split_args[0]), int(split_args[1])
+            seed = int(split_args[4]) if len(split_args) > 4 else None
         except ValueError:
             print('*** Incorrect args set')
             return False
 
         try:
             if split_args[3] in generate.keys():
-                begin = datetime.now()
-                self.curr_labyrinth = generate[split_args[3]](int(x_bound), int(y_bound)).generate()
-                end = datetime.now()
-
-                print('Labyrinth generated in:', '{:.3f}'.format((end - begin).microseconds / 1000), 'ms')
+                begin = perf_counter()
+                self.curr_labyrinth = generate[split_args[3]](int(x_bound), int(y_bound), seed, finish).generate()
+                self.curr_index = None
+                self.curr_editor = None
+                self.__cache_generated()
+                end = perf_counter()
+
+                print('Labyrinth generated in:', '{:.3f}'.format((end - begin) * 1000), 'ms',
+                      f'with seed {self.curr_labyrinth.seed}')
             else:
                 print('*** Incorrect args set: No such generation algorithm')
         except ValueError as err:
@@ -66,63 +95,456 @@ class LabCmd(Cmd):
 
         self.curr_name = split_args[2]
 
-    def do_solve(self, _):
+    def __cache_generated(self):
+        """Caches generated labyrinth, its id is a valid key since the cache keeps the labyrinth alive"""
+        self.curr_key = ('generated', id(self.curr_labyrinth))
+        self.cache.put(self.curr_key, self.curr_labyrinth)
+
+    def precmd(self, line):
+        """
+            Maps dashed command names like generate-batch onto do_generate_batch methods
+            Starts collecting statistics of instrumented commands
+        """
+        command, separator, rest = line.partition(' ')
+        command = command.replace('-', '_')
+
+        if command in self.instrumented:
+            stats.reset(command)
+
+        return command + separator + rest
+
+    def do_generate_batch(self, args):
+        """This method provides generate-batch command"""
+
+        split_args = args.split()
+        options = {'--workers': None, '--seed': None, '--format': 'csv'}
+
+        try:
+            while len(split_args) > 5 and split_args[-2] in options:
+                options[split_args[-2]] = split_args[-1]
+                split_args = split_args[:-2]
+
+            if len(split_args) != 5:
+                print('*** Incorrect args set')
+                return False
+
+            count, x_bound, y_bound = int(split_args[0]), int(split_args[1]), int(split_args[2])
+
+            if split_args[3] not in generate.keys():
+                print('*** Incorrect args set: No such generation algorithm')
+                return False
+
+            batch = BatchGenerator(generate[split_args[3]], x_bound, y_bound,
+                                   None if options['--workers'] is None else int(options['--workers']),
+                                   None if options['--seed'] is None else int(options['--seed']),
+                                   options['--format'])
+            report = batch.generate(count, split_args[4], split_args[3])
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        print(f'{report.count} labyrinths generated in {report.seconds:.3f} s by {report.workers} workers:',
+              f'{report.throughput:.1f} labyrinths/sec, seed {batch.seed}')
+
+    def do_generate_tiled(self, args):
+        """This method provides generate-tiled command"""
+
+        split_args = args.split()
+        options = {'--tile': '256', '--workers': None, '--seed': None, '--finish': 'random'}
+
+        try:
+            while len(split_args) > 3 and split_args[-2] in options:
+                options[split_args[-2]] = split_args[-1]
+                split_args = split_args[:-2]
+
+            if len(split_args) == 3:
+                split_args.append('dfs')
+            elif len(split_args) != 4:
+                print('*** Incorrect args set')
+                return False
+
+            x_bound, y_bound = int(split_args[0]), int(split_args[1])
+
+            if split_args[3] not in generate.keys():
+                print('*** Incorrect args set: No such generation algorithm')
+                return False
+
+            generator = TiledGenerator(generate[split_args[3]], x_bound, y_bound,
+                                       None if options['--seed'] is None else int(options['--seed']),
+                                       int(options['--tile']),
+                                       None if options['--workers'] is None else int(options['--workers']),
+                                       options['--finish'])
+
+            begin = perf_counter()
+            self.curr_labyrinth = generator.generate()
+            end = perf_counter()
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        self.curr_index = None
+        self.curr_editor = None
+        self.curr_name = split_args[2]
+        self.__cache_generated()
+
+        print('Labyrinth generated in:', '{:.3f}'.format((end - begin) * 1000), 'ms',
+              f'by {generator.workers} workers with seed {self.curr_labyrinth.seed}')
+
+    def do_stream(self, args):
+        """This method provides stream command"""
+
+        split_args = re.split(r'\s+', args.strip())
+
+        try:
+            if len(split_args) < 2:
+                print('*** Incorrect args set')
+                return False
+
+            stream = EllerGenerator(int(split_args[0]), int(split_args[1])).stream()
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        if len(split_args) > 2:
+            self.lab_loader.save_labyrinth_stream(stream, split_args[2])
+            print(f'Labyrinth \'{split_args[2]}\' successfully saved')
+        else:
+            Printer(stream, self.conf, self.style).print_labyrinth()
+
+    def do_animate(self, args):
+        """This method provides animate command"""
+
+        split_args = re.split(r'\s+', args.strip())
+        options = {'--fps': 30.0, '--speed': None}
+
+        try:
+            while len(split_args) > 4 and split_args[-2] in options:
+                options[split_args[-2]] = float(split_args[-1])
+                split_args = split_args[:-2]
+
+            if len(split_args) == 3:
+                split_args.append('dfs')
+            elif len(split_args) < 3:
+                print('*** Incorrect args set')
+                return False
+
+            x_bound, y_bound = int(split_args[0]), int(split_args[1])
+            seed = int(split_args[4]) if len(split_args) > 4 else None
+
+            if split_args[3] not in generate.keys():
+                print('*** Incorrect args set: No such generation algorithm')
+                return False
+
+            animator = Animator(generate[split_args[3]](x_bound, y_bound, seed), self.conf, self.style,
+                                options['--fps'], options['--speed'])
+            labyrinth = animator.run()
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        if labyrinth is None:
+            print('Generation cancelled')
+            return False
+
+        self.curr_labyrinth = labyrinth
+        self.curr_name = split_args[2]
+        self.curr_index = None
+        self.curr_editor = None
+        self.__cache_generated()
+
+        print(f'Labyrinth animated in {animator.frames} frames, drawing took {animator.drawing * 1000:.3f} ms')
+
+    def do_solve(self, args):
         """This method provides solve command"""
 
+        split_args = args.split()
+
         if self.curr_name is not None:
-            begin = datetime.now()
-            solved = self.solver.solve(self.curr_labyrinth)
-            end = datetime.now()
-
-            Printer(Labyrinth(self.curr_labyrinth.algo,
-                              solved,
-                              self.curr_labyrinth.width,
-                              self.curr_labyrinth.height,
-                              self.curr_labyrinth.start_cell,
-                              self.curr_labyrinth.finish_cell),
-                    self.conf, self.style
-                    ).print_labyrinth()
-
-            print('Labyrinth solved in:', '{:.3f}'.format((end - begin).microseconds / 1000), 'ms')
+            try:
+                solver = Solver(split_args[0]) if split_args else self.solver
+                begin = perf_counter()
+                solved = self.cache.get_solution(self.curr_key, solver.strategy)
+
+                if solved is None and self.curr_editor is not None and not split_args:
+                    """Edited labyrinth keeps its shortest path up to date incrementally"""
+                    solved = self.curr_editor.solution()
+                elif solved is None:
+                    solved = solver.solve(self.curr_labyrinth)
+                    self.cache.put_solution(self.curr_key, solver.strategy, solved)
+
+                end = perf_counter()
+            except ValueError as err:
+                print(f'*** {err}')
+                return False
+
+            Printer(self.curr_labyrinth, self.conf, self.style, solved).print_labyrinth()
+
+            print('Labyrinth solved in:', '{:.3f}'.format((end - begin) * 1000), 'ms')
         else:
             print('*** No labyrinth is focused')
             return False
 
+    def do_edit(self, args):
+        """This method provides edit command"""
+
+        split_args = args.split()
+
+        if self.curr_labyrinth is None:
+            print('*** No labyrinth is focused')
+            return False
+
+        try:
+            if self.curr_editor is None:
+                self.curr_editor = LabyrinthEditor(self.curr_labyrinth)
+
+            match split_args:
+                case ['open', x, y, side]:
+                    result = self.curr_editor.open_wall((int(x), int(y)), side)
+                case ['close', x, y, side]:
+                    result = self.curr_editor.close_wall((int(x), int(y)), side)
+                case ['start', x]:
+                    result = self.curr_editor.move_start(int(x))
+                case ['finish', x, y]:
+                    result = self.curr_editor.move_finish((int(x), int(y)))
+                case _:
+                    print('*** Incorrect args set')
+                    return False
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        """Edited labyrinth no longer matches its save, so it is cached as a generated one"""
+        self.cache.discard(self.curr_key)
+        self.__cache_generated()
+        self.curr_index = None
+
+        print(f'Solvable: {"yes" if result.solvable else "no"}, loops: {result.loops}')
+
+        if result.broke_solution:
+            print('Edit made the labyrinth unsolvable')
+
+        if result.created_loop:
+            print('Edit created a loop')
+
+    def do_route(self, args):
+        """This method provides route command"""
+
+        if self.curr_labyrinth is None:
+            print('*** No labyrinth is focused')
+            return False
+
+        try:
+            x_first, y_first, x_second, y_second = (int(arg) for arg in args.split())
+
+            if self.curr_index is None:
+                self.curr_index = TreeIndex(self.curr_labyrinth)
+
+            route = self.curr_index.path((x_first, y_first), (x_second, y_second))
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        Printer(self.curr_labyrinth, self.conf, self.style, route).print_labyrinth()
+        print('Route length:', route.length - 1)
+
     def do_save(self, args):
         """This method provides save command"""
 
-        split_args = re.split(r'\s+', args)
+        split_args = args.split()
 
         if len(split_args) == 0:
             name = self.curr_name
         else:
             name = split_args[0]
 
+        file_format = split_args[1] if len(split_args) > 1 else 'csv'
+
         if self.curr_labyrinth is None:
             print('*** No labyrinth is focused')
             return False
 
-        if os.path.isfile(os.path.join(os.path.dirname(__file__), 'maps', f'{name}.csv')):
+        if file_format not in ('csv', 'csv.gz', 'csv.xz', 'lab'):
+            print(f'*** Incorrect args set: No such save format: {file_format}')
+            return False
+
+        if os.path.isfile(os.path.join(os.path.dirname(__file__), 'maps', f'{name}.{file_format}')):
             print(f'Save named {name} already exists, overwrite? [y/n]')
 
             if input() != 'y':
                 return False
 
-        self.lab_loader.save_labyrinth_csv(self.curr_labyrinth, name)
+        try:
+            if file_format == 'lab':
+                self.lab_loader.save_labyrinth_lab(self.curr_labyrinth, name)
+            else:
+                self.lab_loader.save_labyrinth_csv(self.curr_labyrinth, name, file_format[4:] or None)
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
         print(f'Labyrinth \'{name}\' successfully saved')
 
+    def do_export(self, args):
+        """This method provides export command"""
+
+        split_args = args.split()
+        options = {'--cell': '4', '--wall': '1', '--solve': None}
+
+        if self.curr_labyrinth is None:
+            print('*** No labyrinth is focused')
+            return False
+
+        try:
+            while len(split_args) > 1 and split_args[-2] in options:
+                options[split_args[-2]] = split_args[-1]
+                split_args = split_args[:-2]
+
+            if len(split_args) != 1:
+                print('*** Incorrect args set')
+                return False
+
+            solution = None
+            if options['--solve'] is not None:
+                solution = self.cache.get_solution(self.curr_key, options['--solve'])
+
+                if solution is None:
+                    solution = Solver(options['--solve']).solve(self.curr_labyrinth)
+                    self.cache.put_solution(self.curr_key, options['--solve'], solution)
+
+            image_format = os.path.splitext(split_args[0])[1][1:].lower()
+            if image_format not in ImageExporter.formats:
+                print(f'*** Incorrect args set: No such image format: {image_format}')
+                return False
+
+            exporter = ImageExporter(self.curr_labyrinth, int(options['--cell']), int(options['--wall']), solution)
+
+            begin = perf_counter()
+            with open(split_args[0], 'wb') as file:
+                exporter.write(file, image_format)
+            end = perf_counter()
+        except (ValueError, OSError) as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+        print(f'Image {exporter.width}x{exporter.height} exported in:', '{:.3f}'.format((end - begin) * 1000), 'ms')
+
     def do_load(self, args):
         """This method provides solve command"""
 
         split_args = re.split(r'\s+', args)
         name = split_args[0]
+        formats = {record.format for record in self.lab_loader.catalog.find(name)}
 
-        if os.path.isfile(os.path.join(os.path.dirname(__file__), 'maps', f'{name}.csv')):
-            self.curr_labyrinth = self.lab_loader.load_labyrinth_csv(name)
-            self.curr_name = name
-            print(f'Labyrinth \'{self.curr_name}\' successfully loaded')
-        else:
+        if not formats:
+            """Saves made before the catalog existed are looked up on disk"""
+            compression = self.lab_loader.find_labyrinth_csv(name)
+
+            if os.path.isfile(os.path.join(os.path.dirname(__file__), 'maps', f'{name}.lab')):
+                formats.add('lab')
+            elif compression is not None:
+                formats.add(f'csv.{compression}' if compression else 'csv')
+
+        """Lab save is preferred, cache key contains modification time and size, so changed saves are reloaded"""
+        file_format = 'lab' if 'lab' in formats else min(formats, default=None)
+
+        try:
+            file_info = os.stat(os.path.join(os.path.dirname(__file__), 'maps', f'{name}.{file_format}'))
+        except FileNotFoundError:
             print(f'*** Labyrinth \'{name}\' does not exist')
+            return False
+
+        key = (name, file_format, file_info.st_mtime_ns, file_info.st_size)
+        labyrinth = self.cache.get(key)
+
+        if labyrinth is None:
+            if file_format == 'lab':
+                labyrinth = self.lab_loader.load_labyrinth_lab(name)
+            else:
+                labyrinth = self.lab_loader.load_labyrinth_csv(name, file_format[4:])
+
+            self.cache.put(key, labyrinth)
+
+        self.curr_labyrinth = labyrinth
+        self.curr_key = key
+        self.curr_index = None
+        self.curr_editor = None
+        self.curr_name = name
+        print(f'Labyrinth \'{self.curr_name}\' successfully loaded')
+
+    def do_view(self, args):
+        """This method provides view command"""
+
+        split_args = args.split()
+
+        if len(split_args) != 5:
+            print('*** Incorrect args set')
+            return False
+
+        name = split_args[0]
+
+        if not self.lab_loader.catalog.select(name=name, file_format='lab'):
+            print(f'*** Labyrinth \'{name}\' does not exist')
+            return False
+
+        try:
+            x, y, width, height = (int(arg) for arg in split_args[1:])
+
+            with self.lab_loader.open_labyrinth_lab(name) as lab_file:
+                Printer(lab_file.labyrinth(), self.conf, self.style).print_viewport(x, y, width, height)
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
+
+    def do_stats(self, args):
+        """This method provides stats command"""
+
+        match args.strip():
+            case '':
+                if stats.enabled:
+                    print(stats.report())
+                else:
+                    print('Statistics are disabled, enable them by \'stats on\'')
+            case 'on':
+                stats.enabled = True
+                print('Statistics enabled')
+            case 'off':
+                stats.enabled = False
+                print('Statistics disabled')
+            case _:
+                print('*** Incorrect args set')
+                return False
+
+    def do_analyze(self, _):
+        """This method provides analyze command"""
+
+        if self.curr_labyrinth is None:
+            print('*** No labyrinth is focused')
+            return False
+
+        begin = perf_counter()
+        report = analyze(self.curr_labyrinth)
+        end = perf_counter()
+
+        print(f'Cells: {report.cells}, dead ends: {report.dead_ends}, diameter: {report.diameter}, '
+              f'solution length: {"-" if report.solution_length is None else report.solution_length}')
+        print('Cells by open walls:', ', '.join(f'{degree}: {count}' for degree, count in enumerate(report.branching)))
+        print('Analyzed in:', '{:.3f}'.format((end - begin) * 1000), 'ms')
+
+    def do_cache(self, args):
+        """This method provides cache command"""
+
+        if args.strip() == 'clear':
+            self.cache.clear()
+            print('Cache cleared')
+        elif args.strip():
+            print('*** Incorrect args set')
+            return False
+        else:
+            requests = self.cache.hits + self.cache.misses
+            hit_rate = f'{self.cache.hits / requests:.1%}' if requests else '-'
+
+            print(f'Cached labyrinths: {len(self.cache)}, cells: {self.cache.size} of {self.cache.budget}')
+            print(f'Hits: {self.cache.hits}, misses: {self.cache.misses}, hit rate: {hit_rate}')
 
     def do_focus(self, _):
         """This method provides focus command"""
@@ -132,23 +554,60 @@ class LabCmd(Cmd):
         else:
             print(self.curr_name)
 
-    def do_show(self, _):
+    def do_show(self, args):
         """This method provides show command"""
 
+        split_args = args.split()
+
         if self.curr_labyrinth is None:
             print('*** No labyrinth is focused')
-        else:
+        elif len(split_args) == 0:
             Printer(self.curr_labyrinth, self.conf, self.style).print_labyrinth()
+        else:
+            try:
+                x, y, width, height = (int(arg) for arg in split_args)
+                Printer(self.curr_labyrinth, self.conf, self.style).print_viewport(x, y, width, height)
+            except ValueError as err:
+                print(f'*** Incorrect args set: {err}')
+                return False
 
-    def do_list(self, _):
+    def do_list(self, args):
         """This method provides list command"""
 
-        saves = []
+        split_args = args.split()
+        options = {'--algo': None, '--format': None, '--width': None, '--height': None,
+                   '--sort': 'name', '--limit': None}
+        flags = {'--desc': False, '--rebuild': False}
 
-        for file in os.listdir(os.path.join(os.path.dirname(__file__), 'maps')):
-            saves.append(file.split('.')[0])
+        try:
+            while split_args:
+                if split_args[0] in flags:
+                    flags[split_args.pop(0)] = True
+                elif split_args[0] in options and len(split_args) > 1:
+                    options[split_args[0]] = split_args[1]
+                    split_args = split_args[2:]
+                else:
+                    print(f'*** Incorrect args set: {split_args[0]}')
+                    return False
+
+            if flags['--rebuild']:
+                added, removed = self.lab_loader.index_saves()
+                print(f'Saves added to catalog: {added}, removed from catalog: {removed}')
+
+            records = self.lab_loader.catalog.select(
+                algo=options['--algo'], file_format=options['--format'],
+                width=None if options['--width'] is None else int(options['--width']),
+                height=None if options['--height'] is None else int(options['--height']),
+                order=options['--sort'], descending=flags['--desc'],
+                limit=None if options['--limit'] is None else int(options['--limit']))
+        except ValueError as err:
+            print(f'*** Incorrect args set: {err}')
+            return False
 
-        print('Existing saves:', *saves, sep='\n* ')
+        print('Existing saves:', *(f'{record.name} [{record.format}] {record.width}x{record.height} {record.algo}, '
+                                   f'seed {record.seed}, {record.file_size} bytes, '
+                                   f'solution {record.solution_length}, dead ends {record.dead_ends}'
+                                   for record in records), sep='\n* ')
 
     def do_configure(self, args):
         """This method provides configure command"""
@@ -210,5 +669,6 @@ class LabCmd(Cmd):
         return True
 
 
-lab_cmd = LabCmd()
-lab_cmd.cmdloop('Welcome to shell labyrinth generator!')
+if __name__ == '__main__':
+    lab_cmd = LabCmd()
+    lab_cmd.cmdloop('Welcome to shell labyrinth generator!')
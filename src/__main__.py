@@ -0,0 +1,7 @@
+"""This module runs command line interface: python -m src"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
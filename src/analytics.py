@@ -0,0 +1,91 @@
+"""This module contains linear time analytics of labyrinths"""
+
+from array import array
+from dataclasses import dataclass
+
+from .entities import Grid
+from .entities import Labyrinth
+
+"""Translation tables giving number of open walls of the cell and marking dead ends with exactly one open wall"""
+DEGREE = bytes(4 - bin(walls & Grid.ALL).count('1') for walls in range(256))
+DEAD_END = bytes(1 if bin(walls & Grid.ALL).count('1') == 3 else 0 for walls in range(256))
+
+
+@dataclass
+class MazeStats:
+    """
+        This class represents labyrinth analytics
+        Lengths are measured in cells like solution length, branching holds cell counts by open walls count
+    """
+    cells: int
+    dead_ends: int
+    diameter: int
+    solution_length: int | None
+    branching: list[int]
+
+
+def distance_map(walls: bytes, height: int, source: int) -> array:
+    """Takes sealed walls, returns BFS distances in steps from the source cell, unreachable cells get -1"""
+    distances = array('i', [-1]) * len(walls)
+    distances[source] = 0
+    order = [source]
+    moves = ((Grid.TOP, -1), (Grid.BOTTOM, 1), (Grid.LEFT, -height), (Grid.RIGHT, height))
+
+    """Iterating over list while appending to it is a queue without popping"""
+    for index in order:
+        closed, distance = walls[index], distances[index] + 1
+
+        for wall, offset in moves:
+            if not closed & wall and distances[index + offset] < 0:
+                distances[index + offset] = distance
+                order.append(index + offset)
+
+    return distances
+
+
+def farthest_cell(distances: array) -> int:
+    """Returns index of the cell with the largest distance, in a perfect labyrinth it is a dead end"""
+    return distances.index(max(distances))
+
+
+def diameter(walls: bytes, height: int, source: int = 0) -> int:
+    """
+        Takes sealed walls, returns length of the longest path between two cells of the source component
+        Two BFS passes give exact diameter of perfect labyrinths and a lower bound for labyrinths with loops
+    """
+    distances = distance_map(walls, height, farthest_cell(distance_map(walls, height, source)))
+
+    return max(distances) + 1
+
+
+def path_length(walls: bytes, height: int, source: int, target: int) -> int | None:
+    """Takes sealed walls, returns number of cells of the shortest path between two cells, None if there is none"""
+    distance = distance_map(walls, height, source)[target]
+
+    return distance + 1 if distance >= 0 else None
+
+
+def dead_ends(walls: bytes) -> int:
+    """Takes sealed walls, returns number of cells with exactly one open wall"""
+    return walls.translate(DEAD_END).count(1)
+
+
+def branching(walls: bytes) -> list[int]:
+    """Takes sealed walls, returns numbers of cells with 0, 1, 2, 3 and 4 open walls"""
+    degrees = walls.translate(DEGREE)
+
+    return [degrees.count(degree) for degree in range(5)]
+
+
+def analyze(labyrinth: Labyrinth) -> MazeStats:
+    """Computes all analytics of the labyrinth in a few linear passes"""
+    grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+    walls = bytes(grid.sealed_walls())
+
+    """Distances from start give both solution length and the first end of the diameter"""
+    distances = distance_map(walls, grid.height, grid.index(labyrinth.start_cell))
+    finish_distance = distances[grid.index(labyrinth.finish_cell)]
+
+    return MazeStats(len(walls), dead_ends(walls),
+                     max(distance_map(walls, grid.height, farthest_cell(distances))) + 1,
+                     finish_distance + 1 if finish_distance >= 0 else None, branching(walls))
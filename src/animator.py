@@ -0,0 +1,178 @@
+"""This module contains terminal animation of step-wise labyrinth generation"""
+
+import re
+import shutil
+import sys
+from time import perf_counter
+from time import sleep
+from typing import TextIO
+
+from .entities import Grid
+from .entities import Labyrinth
+from .generator import Generator
+from .printer import Printer
+
+"""Screen glyph: colored character with its escape codes or a plain one"""
+GLYPH = re.compile(r'\x1b\[[\d;]*m[^\x1b]*\x1b\[0m|[^\n]')
+
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+CLEAR_LINE = '\x1b[K'
+
+
+class Animator:
+    """
+        Class animating step-wise generation in terminal
+        Carve events are applied to a mirror grid, rows touched by them are rendered again through Printer
+        and only glyphs differing from the screen are written, every run of them after one ANSI cursor move
+        Frames are drawn at most fps times per second and rarer if drawing takes more than its share of time,
+        speed limits carve events per second to watch small labyrinths
+        Only the window fitting the terminal is drawn, status line below it shows progress,
+        interrupting animation by Ctrl+C cancels generation
+    """
+    batch_size = 64
+    share = 0.1
+
+    def __init__(self, generator: Generator, conf: dict, styles: dict, fps: float = 30, speed: float = None,
+                 window: tuple[int, int, int, int] = None, file: TextIO = None) -> None:
+        if fps <= 0 or speed is not None and speed <= 0:
+            raise ValueError('Frame rate and speed must be positive')
+
+        if window is None:
+            columns, lines = shutil.get_terminal_size()
+            window = (0, 0, min(generator.width, max(1, (columns - 1) // 2)),
+                      min(generator.height, max(1, (lines - 3) // 2)))
+
+        x, y, width, height = window
+        if not (0 <= x < generator.width and 0 <= y < generator.height and width > 0 and height > 0):
+            raise ValueError('Window is out of labyrinth')
+
+        self.__generator = generator
+        self.__conf = conf
+        self.__styles = styles
+        self.__interval = 1 / fps
+        self.__speed = speed
+        self.__window = (x, y, min(width, generator.width - x), min(height, generator.height - y))
+        self.__file = sys.stdout if file is None else file
+        self.__screen: list[list[str]] = []
+        self.frames = 0
+        self.drawing = 0.0
+
+    def __get_lines(self, printer: Printer, row: int) -> tuple[int, list[str]]:
+        """Renders window lines of the row, returns screen line of the first one and the lines"""
+        x, y, width, _ = self.__window
+        lines = list(printer.render_frame(x, row, width, 1))
+
+        """Frame starts with entry line if the window touches the top, every row takes two lines"""
+        return (y == 0) + 2 * (row - y) - (row == 0), lines
+
+    def __draw(self, printer: Printer, rows: set[int]) -> str:
+        """Returns escape sequences moving cursor to every run of changed glyphs of the rows and writing it"""
+        parts = []
+
+        for row in sorted(rows):
+            first, lines = self.__get_lines(printer, row)
+
+            for number, line in enumerate(lines, first):
+                glyphs, screen = GLYPH.findall(line), self.__screen[number]
+                column = 0
+
+                while column < len(glyphs):
+                    if glyphs[column] == screen[column]:
+                        column += 1
+                        continue
+
+                    end = column
+                    while end < len(glyphs) and glyphs[end] != screen[end]:
+                        end += 1
+
+                    parts.append(f'\x1b[{number + 1};{column + 1}H' + ''.join(glyphs[column:end]))
+                    screen[column:end] = glyphs[column:end]
+                    column = end
+
+        return ''.join(parts)
+
+    def __status(self, text: str) -> str:
+        return f'\x1b[{len(self.__screen) + 1};1H{text}{CLEAR_LINE}'
+
+    def run(self) -> Labyrinth | None:
+        """Animates generation of the next labyrinth, returns it or None if generation was cancelled"""
+        generator, file = self.__generator, self.__file
+        x, y, width, height = self.__window
+        grid = Grid(generator.width, generator.height)
+        algo = type(generator).__name__
+        printer = Printer(Labyrinth(algo, grid, generator.width, generator.height, (-1, -1), (-1, -1)),
+                          self.__conf, self.__styles)
+
+        self.__screen = [GLYPH.findall(line) for line in printer.render_frame(x, y, width, height)]
+        file.write(HIDE_CURSOR + CLEAR_SCREEN + '\n'.join(map(''.join, self.__screen)))
+
+        events = generator.steps()
+        total, carved = generator.width * generator.height - 1, 0
+
+        """Cells of window columns with one extra column on every side form a range of flat indices"""
+        first_cell, last_cell, last_row = max(x - 1, 0) * grid.height, (x + width + 1) * grid.height, y + height
+        dirty = set()
+        begin = next_frame = perf_counter()
+        labyrinth, status = None, None
+
+        try:
+            while True:
+                index, wall = next(events)
+                neighbour = grid.carve(index, wall)
+                carved += 1
+
+                """Rows of both cells are redrawn, it covers border lines above and below them"""
+                for cell in (index, neighbour):
+                    if first_cell <= cell < last_cell and y <= cell % grid.height < last_row:
+                        dirty.add(cell % grid.height)
+
+                """Clock is checked once in a batch of events unless speed is limited"""
+                if self.__speed is None and carved & self.batch_size - 1:
+                    continue
+
+                now = perf_counter()
+                if self.__speed is not None and carved > (now - begin) * self.__speed:
+                    sleep(carved / self.__speed - (now - begin))
+                    now = perf_counter()
+
+                if now >= next_frame:
+                    file.write(self.__draw(printer, dirty) +
+                               self.__status(f'{algo}: carved {carved}/{total} ({carved / total:.1%}), '
+                                             f'{now - begin:.1f} s'))
+                    file.flush()
+                    dirty.clear()
+
+                    """Slow frames are drawn less often, so drawing keeps its share of the time"""
+                    drawn = perf_counter()
+                    next_frame = drawn + max(self.__interval, (drawn - now) * (1 - self.share) / self.share)
+                    self.frames += 1
+                    self.drawing += drawn - now
+        except StopIteration as stop:
+            labyrinth = stop.value
+        except KeyboardInterrupt:
+            events.close()
+            status = f'{algo}: cancelled after {carved}/{total} carved cells'
+        finally:
+            elapsed = perf_counter() - begin
+
+            if labyrinth is not None:
+                """
+                    Final frame shows entry and finish picked after carving,
+                    or the whole labyrinth if it had no events
+                """
+                printer = Printer(labyrinth, self.__conf, self.__styles)
+                if carved < total:
+                    dirty = set(range(y, last_row))
+                else:
+                    dirty |= {row for row in (labyrinth.start_cell[1], labyrinth.finish_cell[1]) if y <= row < last_row}
+                status = f'{algo}: carved {carved}/{total} in {elapsed:.3f} s, seed {labyrinth.seed}'
+            elif status is None:
+                status = f'{algo}: failed after {carved}/{total} carved cells'
+
+            file.write(self.__draw(printer, dirty) + self.__status(status) + '\n' + SHOW_CURSOR)
+            file.flush()
+            self.frames += 1
+
+        return labyrinth
@@ -0,0 +1,101 @@
+"""This module contains parallel batch generation of labyrinths"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from hashlib import blake2b
+from time import perf_counter
+
+from .generator import Generator
+from .loader import Loader
+
+
+@dataclass
+class BatchReport:
+    """This class represents results of batch generation"""
+    names: list[str]
+    workers: int
+    seconds: float
+
+    @property
+    def count(self) -> int:
+        return len(self.names)
+
+    @property
+    def throughput(self) -> float:
+        """Labyrinths generated per second"""
+        return self.count / self.seconds if self.seconds > 0 else float('inf')
+
+
+def derive_seed(seed: int, number: int) -> int:
+    """Derives seed of the labyrinth from batch seed and its number, so it does not depend on worker assignment"""
+    return int.from_bytes(blake2b(f'{seed}:{number}'.encode(), digest_size=8).digest(), 'little') >> 1
+
+
+def generate_one(generator: type[Generator], width: int, height: int,
+                 seed: int, out_dir: str, name: str, file_format: str) -> str:
+    """Generates single labyrinth with given seed and saves it, runs inside worker process"""
+    labyrinth = generator(width, height, seed).generate()
+
+    loader = Loader(out_dir)
+    if file_format == 'lab':
+        loader.save_labyrinth_lab(labyrinth, name)
+    else:
+        loader.save_labyrinth_csv(labyrinth, name, file_format[4:] or None)
+
+    return name
+
+
+class BatchGenerator:
+    """
+        Class generating batches of labyrinths in a process pool
+        Every labyrinth gets seed derived from the batch seed and its number,
+        so output is the same for the same seed regardless of worker count
+    """
+    formats = ('csv', 'csv.gz', 'csv.xz', 'lab')
+
+    def __init__(self, generator: type[Generator], width: int, height: int,
+                 workers: int = None, seed: int = None, file_format: str = 'csv') -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError('Dimensions must be positive')
+
+        if workers is not None and workers <= 0:
+            raise ValueError('Workers count must be positive')
+
+        if file_format not in self.formats:
+            raise ValueError(f'No such save format: {file_format}')
+
+        self.__generator = generator
+        self.__width = width
+        self.__height = height
+        self.__workers = workers or os.cpu_count() or 1
+        self.__seed = random.getrandbits(63) if seed is None else seed
+        self.__format = file_format
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    def generate(self, count: int, out_dir: str, prefix: str = 'labyrinth') -> BatchReport:
+        """Generates count labyrinths and saves them into out_dir as prefix followed by labyrinth number"""
+        names = [f'{prefix}_{number:0{len(str(count - 1))}d}' for number in range(count)]
+        tasks = ([self.__generator] * count, [self.__width] * count, [self.__height] * count,
+                 [derive_seed(self.__seed, number) for number in range(count)],
+                 [out_dir] * count, names, [self.__format] * count)
+
+        os.makedirs(out_dir, exist_ok=True)
+        begin = perf_counter()
+
+        if self.__workers == 1:
+            saved = list(map(generate_one, *tasks))
+        else:
+            with ProcessPoolExecutor(self.__workers) as executor:
+                saved = list(executor.map(generate_one, *tasks,
+                                          chunksize=max(1, count // (self.__workers * 4))))
+
+        return BatchReport(saved, self.__workers, perf_counter() - begin)
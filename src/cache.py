@@ -0,0 +1,100 @@
+"""This module contains in-memory cache of labyrinths and their solutions"""
+
+from collections import OrderedDict
+from typing import Hashable
+
+from .entities import Labyrinth
+from .entities import Solution
+
+
+class LabyrinthCache:
+    """
+        LRU cache of labyrinths along with their solutions by strategy
+        Size of the cache is measured in labyrinth cells plus solution path cells,
+        least recently used labyrinths are evicted when the size exceeds the budget
+    """
+
+    def __init__(self, budget: int = 1 << 26) -> None:
+        if budget <= 0:
+            raise ValueError('Cache budget must be positive')
+
+        self.__budget = budget
+        self.__entries: OrderedDict[Hashable, tuple[Labyrinth, dict[str, Solution]]] = OrderedDict()
+        self.__size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def budget(self) -> int:
+        return self.__budget
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    @staticmethod
+    def __get_cost(labyrinth: Labyrinth, solutions: dict[str, Solution]) -> int:
+        return labyrinth.width * labyrinth.height + sum(len(solution) for solution in solutions.values())
+
+    def __evict(self) -> None:
+        while self.__size > self.__budget:
+            _, (labyrinth, solutions) = self.__entries.popitem(last=False)
+            self.__size -= self.__get_cost(labyrinth, solutions)
+
+    def get(self, key: Hashable) -> Labyrinth | None:
+        """Returns cached labyrinth marking it as recently used, None on miss"""
+        if key not in self.__entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+
+        return self.__entries[key][0]
+
+    def put(self, key: Hashable, labyrinth: Labyrinth) -> None:
+        """Caches labyrinth dropping solutions of the previous one under the same key"""
+        self.discard(key)
+        self.__entries[key] = (labyrinth, {})
+        self.__size += self.__get_cost(labyrinth, {})
+        self.__evict()
+
+    def get_solution(self, key: Hashable, strategy: str) -> Solution | None:
+        """Returns cached solution of the labyrinth found by strategy, None on miss"""
+        if key not in self.__entries or strategy not in self.__entries[key][1]:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+
+        return self.__entries[key][1][strategy]
+
+    def put_solution(self, key: Hashable, strategy: str, solution: Solution) -> None:
+        """Caches solution of already cached labyrinth"""
+        if key not in self.__entries:
+            return
+
+        solutions = self.__entries[key][1]
+        self.__size += len(solution) - (len(solutions[strategy]) if strategy in solutions else 0)
+        solutions[strategy] = solution
+        self.__entries.move_to_end(key)
+        self.__evict()
+
+    def discard(self, key: Hashable) -> None:
+        """Removes labyrinth and its solutions from the cache, e.g. after it was changed"""
+        if key in self.__entries:
+            labyrinth, solutions = self.__entries.pop(key)
+            self.__size -= self.__get_cost(labyrinth, solutions)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__size = 0
+        self.hits = 0
+        self.misses = 0
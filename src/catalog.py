@@ -0,0 +1,95 @@
+"""This module contains catalog of saved labyrinths"""
+
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import astuple
+from dataclasses import dataclass
+from dataclasses import fields
+
+
+@dataclass
+class SaveRecord:
+    """This class represents catalog entry of a saved labyrinth"""
+    name: str
+    format: str
+    width: int
+    height: int
+    algo: str
+    seed: int | None
+    file_size: int
+    solution_length: int | None
+    dead_ends: int
+
+
+class Catalog:
+    """
+        Class keeping metadata of saved labyrinths in SQLite database inside the saves directory,
+        so saves are listed, filtered and found without scanning or parsing files
+    """
+    file_name = 'catalog.sqlite'
+    columns = tuple(field.name for field in fields(SaveRecord))
+
+    def __init__(self, save_path: str) -> None:
+        self.__path = os.path.join(save_path, self.file_name)
+        self.__created = not os.path.isfile(self.__path)
+
+        os.makedirs(save_path, exist_ok=True)
+        with self.__connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS saves ('
+                               'name TEXT NOT NULL, format TEXT NOT NULL, width INTEGER, height INTEGER, '
+                               'algo TEXT, seed INTEGER, file_size INTEGER, solution_length INTEGER, '
+                               'dead_ends INTEGER, PRIMARY KEY (name, format))')
+            connection.execute('CREATE INDEX IF NOT EXISTS saves_algo ON saves (algo)')
+            connection.execute('CREATE INDEX IF NOT EXISTS saves_size ON saves (width, height)')
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def created(self) -> bool:
+        """True if the database did not exist before, so saves made earlier are not recorded in it yet"""
+        return self.__created
+
+    def __connect(self) -> closing:
+        """Returns connection closed on exit, parallel writers wait for each other instead of failing"""
+        connection = sqlite3.connect(self.__path, timeout=60)
+        connection.execute('PRAGMA journal_mode=WAL')
+
+        return closing(connection)
+
+    def add(self, record: SaveRecord) -> None:
+        """Adds record replacing the previous one of the same save"""
+        with self.__connect() as connection, connection:
+            connection.execute(f'INSERT OR REPLACE INTO saves VALUES ({", ".join("?" * len(self.columns))})',
+                               astuple(record))
+
+    def remove(self, name: str, file_format: str) -> None:
+        with self.__connect() as connection, connection:
+            connection.execute('DELETE FROM saves WHERE name = ? AND format = ?', (name, file_format))
+
+    def find(self, name: str) -> list[SaveRecord]:
+        """Returns records of all formats the labyrinth is saved in"""
+        return self.select(name=name)
+
+    def select(self, name: str = None, algo: str = None, file_format: str = None,
+               width: int = None, height: int = None,
+               order: str = 'name', descending: bool = False, limit: int = None) -> list[SaveRecord]:
+        """Returns records matching all given filters sorted by one of the columns"""
+        if order not in self.columns:
+            raise ValueError(f'No such catalog column: {order}')
+
+        filters = {'name': name, 'algo': algo, 'format': file_format, 'width': width, 'height': height}
+        filters = {column: value for column, value in filters.items() if value is not None}
+
+        query = 'SELECT * FROM saves'
+        if filters:
+            query += ' WHERE ' + ' AND '.join(f'{column} = ?' for column in filters)
+
+        query += f' ORDER BY {order} {"DESC" if descending else "ASC"}, name, format'
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
+
+        with self.__connect() as connection:
+            return [SaveRecord(*row) for row in connection.execute(query, tuple(filters.values()))]
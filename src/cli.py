@@ -0,0 +1,249 @@
+"""
+    This module contains non-interactive command line interface reading and writing labyrinths via files or pipes
+    Usage: python -m src generate|solve|render|image|convert|stats ... , '-' stands for stdin and stdout
+    Only argparse is imported at startup, labyrinth modules are imported by the command that needs them,
+    so numpy is only loaded by vectorized algorithms and sqlite is never loaded
+"""
+
+import argparse
+import os
+import sys
+from importlib import import_module
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'conf')
+
+"""Generation algorithms by name as (module, class) pairs imported on demand"""
+ALGORITHMS = {'dfs': ('.generator', 'DFSGenerator'), 'wilson': ('.generator', 'WilsonGenerator'),
+              'prim': ('.generator', 'PrimGenerator'), 'eller': ('.generator', 'EllerGenerator'),
+              'binary': ('.vectorized', 'BinaryTreeGenerator'), 'sidewinder': ('.vectorized', 'SidewinderGenerator')}
+
+FORMATS = ('lab', 'csv', 'csv.gz', 'csv.xz')
+IMAGE_FORMATS = ('png', 'pbm', 'pgm')
+STRATEGIES = ('bfs', 'astar', 'bidirectional', 'dfs')
+FINISHES = ('random', 'farthest')
+
+GZIP_MAGIC = b'\x1f\x8b'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+
+
+def read_labyrinth(source: str):
+    """Reads labyrinth in any supported format from file or stdin, format is detected by content"""
+    if source == '-':
+        data = sys.stdin.buffer.read()
+    else:
+        with open(source, 'rb') as file:
+            data = file.read()
+
+    if data.startswith(GZIP_MAGIC):
+        import gzip
+        data = gzip.decompress(data)
+    elif data.startswith(XZ_MAGIC):
+        import lzma
+        data = lzma.decompress(data)
+
+    from .loader import LAB_MAGIC
+    from .loader import read_csv
+    from .loader import read_lab
+
+    if data.startswith(LAB_MAGIC):
+        return read_lab(data)
+
+    import io
+
+    try:
+        return read_csv(io.StringIO(data.decode('utf-8'), newline=''))
+    except (RuntimeError, KeyError, IndexError, UnicodeDecodeError) as err:
+        raise ValueError('Malformed labyrinth data') from err
+
+
+def write_labyrinth(labyrinth, target: str, file_format: str) -> None:
+    """Writes labyrinth to file or stdout, csv keeps cell types including solution path glyphs"""
+    import io
+    from .entities import Grid
+    from .loader import grid_rows
+    from .loader import write_csv
+    from .loader import write_lab
+
+    grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+
+    if file_format == 'lab':
+        buffer = io.BytesIO()
+        write_lab(buffer, labyrinth, (walls for walls, _ in grid_rows(grid)))
+        data = buffer.getvalue()
+    else:
+        buffer = io.StringIO()
+        write_csv(buffer, labyrinth, grid_rows(grid))
+        data = buffer.getvalue().encode('utf-8')
+
+        if file_format == 'csv.gz':
+            import gzip
+            data = gzip.compress(data, mtime=0)
+        elif file_format == 'csv.xz':
+            import lzma
+            data = lzma.compress(data)
+
+    if target == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    else:
+        with open(target, 'wb') as file:
+            file.write(data)
+
+
+def run_generate(args: argparse.Namespace) -> None:
+    module, name = ALGORITHMS[args.algo]
+    generator = getattr(import_module(module, __package__), name)
+
+    write_labyrinth(generator(args.width, args.height, args.seed, args.finish).generate(), args.output, args.format)
+
+
+def run_solve(args: argparse.Namespace) -> None:
+    from .generator import Solver
+
+    labyrinth = read_labyrinth(args.input)
+    solution = Solver(args.strategy, args.seed).solve(labyrinth)
+
+    if args.path:
+        lines = ''.join(f'{x} {y}\n' for x, y in solution)
+
+        if args.output == '-':
+            sys.stdout.write(lines)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(lines)
+        return
+
+    """Path glyph codes are stored as cell types, so solved csv is rendered with its path"""
+    grid = labyrinth.field
+    for (x, y), code in zip(solution, solution.codes):
+        grid.types[grid.index((x, y))] = code
+
+    write_labyrinth(labyrinth, args.output, args.format)
+
+
+def run_render(args: argparse.Namespace) -> None:
+    from .loader import Loader
+    from .printer import Printer
+
+    labyrinth = read_labyrinth(args.input)
+    solution = None
+
+    if args.solve is not None:
+        from .generator import Solver
+        solution = Solver(args.solve).solve(labyrinth)
+
+    conf_loader = Loader(CONF_PATH)
+    printer = Printer(labyrinth, conf_loader.load_json('conf'), conf_loader.load_json('styles'), solution)
+
+    if args.viewport is None:
+        printer.print_labyrinth()
+    else:
+        printer.print_viewport(*args.viewport)
+
+    sys.stdout.flush()
+
+
+def run_image(args: argparse.Namespace) -> None:
+    from .image import ImageExporter
+
+    labyrinth = read_labyrinth(args.input)
+    solution = None
+
+    if args.solve is not None:
+        from .generator import Solver
+        solution = Solver(args.solve).solve(labyrinth)
+
+    exporter = ImageExporter(labyrinth, args.cell, args.wall, solution, args.path_size)
+
+    if args.output == '-':
+        exporter.write(sys.stdout.buffer, args.format)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, 'wb') as file:
+            exporter.write(file, args.format)
+
+
+def run_convert(args: argparse.Namespace) -> None:
+    write_labyrinth(read_labyrinth(args.input), args.output, args.format)
+
+
+def run_stats(args: argparse.Namespace) -> None:
+    import json
+    from dataclasses import asdict
+    from .analytics import analyze
+
+    labyrinth = read_labyrinth(args.input)
+    report = {'width': labyrinth.width, 'height': labyrinth.height, 'algo': labyrinth.algo,
+              'seed': getattr(labyrinth, 'seed', None), **asdict(analyze(labyrinth))}
+
+    print(json.dumps(report))
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src', description='Labyrinth command line interface')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='generate labyrinth')
+    generate.add_argument('width', type=int)
+    generate.add_argument('height', type=int)
+    generate.add_argument('--algo', choices=ALGORITHMS, default='dfs')
+    generate.add_argument('--seed', type=int)
+    generate.add_argument('--finish', choices=FINISHES, default='random')
+    generate.add_argument('--format', choices=FORMATS, default='lab')
+    generate.add_argument('-o', '--output', default='-')
+    generate.set_defaults(run=run_generate)
+
+    solve = commands.add_parser('solve', help='solve labyrinth, write it with path glyphs or path cells')
+    solve.add_argument('input', nargs='?', default='-')
+    solve.add_argument('--strategy', choices=STRATEGIES, default='bfs')
+    solve.add_argument('--seed', type=int)
+    solve.add_argument('--path', action='store_true', help='write "x y" line of every path cell')
+    solve.add_argument('--format', choices=FORMATS, default='csv', help='lab keeps no path glyphs')
+    solve.add_argument('-o', '--output', default='-')
+    solve.set_defaults(run=run_solve)
+
+    render = commands.add_parser('render', help='render labyrinth as text')
+    render.add_argument('input', nargs='?', default='-')
+    render.add_argument('--solve', nargs='?', const='bfs', choices=STRATEGIES, help='draw path found by strategy')
+    render.add_argument('--viewport', type=int, nargs=4, metavar=('X', 'Y', 'W', 'H'))
+    render.set_defaults(run=run_render)
+
+    image = commands.add_parser('image', help='export labyrinth as raster image')
+    image.add_argument('input', nargs='?', default='-')
+    image.add_argument('--format', choices=IMAGE_FORMATS, default='png')
+    image.add_argument('--cell', type=int, default=4, help='cell size in pixels')
+    image.add_argument('--wall', type=int, default=1, help='wall size in pixels')
+    image.add_argument('--solve', nargs='?', const='bfs', choices=STRATEGIES, help='draw path found by strategy')
+    image.add_argument('--path-size', type=int, help='path line width in pixels')
+    image.add_argument('-o', '--output', default='-')
+    image.set_defaults(run=run_image)
+
+    convert = commands.add_parser('convert', help='convert labyrinth between formats')
+    convert.add_argument('input', nargs='?', default='-')
+    convert.add_argument('--format', choices=FORMATS, default='lab')
+    convert.add_argument('-o', '--output', default='-')
+    convert.set_defaults(run=run_convert)
+
+    stats = commands.add_parser('stats', help='print labyrinth analytics as JSON')
+    stats.add_argument('input', nargs='?', default='-')
+    stats.set_defaults(run=run_stats)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        args.run(args)
+    except (ValueError, OSError) as err:
+        if isinstance(err, BrokenPipeError):
+            """Reader of the pipe has quit, e.g. head, remaining output is dropped silently"""
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+
+        print(f'{parser.prog} {args.command}: error: {err}', file=sys.stderr)
+        return 1
+
+    return 0
@@ -0,0 +1,291 @@
+"""This module contains editing of labyrinths with incremental connectivity"""
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+
+from .entities import Coords
+from .entities import Grid
+from .entities import Labyrinth
+from .entities import Solution
+from .generator import Solver
+
+"""Translation tables marking cells with open right and bottom walls"""
+OPEN_RIGHT = bytes(0 if walls & Grid.RIGHT else 1 for walls in range(256))
+OPEN_BOTTOM = bytes(0 if walls & Grid.BOTTOM else 1 for walls in range(256))
+
+
+@dataclass
+class EditResult:
+    """This class represents outcome of labyrinth edit"""
+    solvable: bool
+    loops: int
+    broke_solution: bool
+    created_loop: bool
+
+
+class LabyrinthEditor:
+    """
+        Class editing labyrinth in place: opening and closing walls, moving start and finish
+        Connected components are kept as cell labels, opening a wall merges smaller component into larger one,
+        closing a wall runs BFS from both its sides in turns, so the cost depends on the smaller side
+        Number of loops is open walls count minus cells count plus components count
+        Shortest path from start to finish is cached, edits splice or truncate it when the result is known
+        to stay shortest, otherwise it is recomputed by bidirectional BFS on the next request
+    """
+    sides = {'top': Grid.TOP, 'bottom': Grid.BOTTOM, 'left': Grid.LEFT, 'right': Grid.RIGHT}
+
+    def __init__(self, labyrinth: Labyrinth) -> None:
+        if not isinstance(labyrinth.field, Grid):
+            labyrinth.field = Grid.from_field(labyrinth.field)
+
+        self.__labyrinth = labyrinth
+        self.__grid = grid = labyrinth.field
+        self.__border = Grid(grid.width, grid.height, bytearray(len(grid.walls))).sealed_walls()
+
+        """Component label of every cell and cells of every component"""
+        self.__labels = array('i', [-1]) * len(grid.walls)
+        self.__members: dict[int, set[int]] = {}
+        self.__next_label = 0
+
+        for index in range(len(grid.walls)):
+            if self.__labels[index] < 0:
+                self.__members[self.__next_label] = self.__label_component(index, self.__next_label)
+                self.__next_label += 1
+
+        sealed = grid.sealed_walls()
+        open_walls = sealed.translate(OPEN_RIGHT).count(1) + sealed.translate(OPEN_BOTTOM).count(1)
+        self.__loops = open_walls - len(grid.walls) + len(self.__members)
+
+        """Cached path of flat indices, its cell positions and flag of path to be recomputed"""
+        self.__path: list[int] | None = None
+        self.__position: dict[int, int] = {}
+        self.__dirty = True
+
+    @property
+    def labyrinth(self) -> Labyrinth:
+        return self.__labyrinth
+
+    @property
+    def loops(self) -> int:
+        return self.__loops
+
+    @property
+    def components(self) -> int:
+        return len(self.__members)
+
+    @property
+    def solvable(self) -> bool:
+        return self.__labels[self.__start] == self.__labels[self.__finish]
+
+    @property
+    def __start(self) -> int:
+        return self.__grid.index(self.__labyrinth.start_cell)
+
+    @property
+    def __finish(self) -> int:
+        return self.__grid.index(self.__labyrinth.finish_cell)
+
+    def __get_moves(self, index: int) -> list[int]:
+        """Takes flat index, returns indices of cells reachable in one step"""
+        closed = self.__grid.walls[index] | self.__border[index]
+        height = self.__grid.height
+
+        return [index + offset for wall, offset in ((Grid.TOP, -1), (Grid.BOTTOM, 1),
+                                                    (Grid.LEFT, -height), (Grid.RIGHT, height))
+                if not closed & wall]
+
+    def __label_component(self, index: int, label: int) -> set[int]:
+        """Labels all cells reachable from the cell, returns them"""
+        self.__labels[index] = label
+        queue, cells = deque([index]), {index}
+
+        while queue:
+            for next_index in self.__get_moves(queue.popleft()):
+                if self.__labels[next_index] != label:
+                    self.__labels[next_index] = label
+                    cells.add(next_index)
+                    queue.append(next_index)
+
+        return cells
+
+    def __get_index(self, coords: Coords) -> int:
+        x, y = coords
+
+        if not (0 <= x < self.__grid.width and 0 <= y < self.__grid.height):
+            raise ValueError(f'Cell {coords} is out of labyrinth')
+
+        return self.__grid.index(coords)
+
+    def __get_wall(self, coords: Coords, side: str) -> tuple[int, int, int]:
+        """Returns cell index, wall flag and neighbour index of inner wall"""
+        if side not in self.sides:
+            raise ValueError(f'No such wall side: {side}')
+
+        index, wall = self.__get_index(coords), self.sides[side]
+
+        if self.__border[index] & wall:
+            raise ValueError('Outer walls cannot be edited')
+
+        return index, wall, index + self.__grid.offset(wall)
+
+    def __set_path(self, path: list[int] | None) -> None:
+        self.__path = path
+        self.__position = {} if path is None else {index: i for i, index in enumerate(path)}
+        self.__dirty = False
+
+    def __invalidate(self) -> None:
+        """Drops cached path, it is recomputed on request if the labyrinth is solvable"""
+        self.__path, self.__position, self.__dirty = None, {}, True
+
+    def __result(self, was_solvable: bool, created_loop: bool) -> EditResult:
+        if not self.solvable:
+            self.__set_path(None)
+
+        return EditResult(self.solvable, self.__loops, was_solvable and not self.solvable, created_loop)
+
+    def open_wall(self, coords: Coords, side: str) -> EditResult:
+        """Opens inner wall of the cell"""
+        index, wall, neighbour = self.__get_wall(coords, side)
+        was_solvable = self.solvable
+
+        if not self.__grid.walls[index] & wall:
+            return self.__result(was_solvable, False)
+
+        self.__grid.carve(index, wall)
+        label, other = self.__labels[index], self.__labels[neighbour]
+
+        if label == other:
+            self.__loops += 1
+
+            """Shortcut between two path cells is spliced in, any other one may shorten the path"""
+            if not self.__dirty and index in self.__position and neighbour in self.__position:
+                first, last = sorted((self.__position[index], self.__position[neighbour]))
+                self.__set_path(self.__path[:first + 1] + self.__path[last:])
+            elif label == self.__labels[self.__start]:
+                self.__invalidate()
+
+            return self.__result(was_solvable, True)
+
+        """Merging smaller component into larger one, path is only affected if start and finish got connected"""
+        if len(self.__members[label]) < len(self.__members[other]):
+            label, other = other, label
+
+        for cell in self.__members[other]:
+            self.__labels[cell] = label
+
+        self.__members[label] |= self.__members.pop(other)
+
+        if not was_solvable and self.solvable:
+            self.__invalidate()
+
+        return self.__result(was_solvable, False)
+
+    def close_wall(self, coords: Coords, side: str) -> EditResult:
+        """Closes inner wall of the cell"""
+        index, wall, neighbour = self.__get_wall(coords, side)
+        was_solvable = self.solvable
+
+        if self.__grid.walls[index] & wall:
+            return self.__result(was_solvable, False)
+
+        self.__grid.walls[index] |= wall
+        self.__grid.walls[neighbour] |= Grid.OPPOSITE[wall]
+
+        on_path = not self.__dirty and index in self.__position and neighbour in self.__position \
+            and abs(self.__position[index] - self.__position[neighbour]) == 1
+
+        if self.__separate(index, neighbour):
+            if on_path:
+                self.__set_path(None)
+        else:
+            self.__loops -= 1
+
+            if on_path:
+                self.__invalidate()
+
+        return self.__result(was_solvable, False)
+
+    def __separate(self, first: int, second: int) -> bool:
+        """
+            Runs BFS from both cells in turns until they meet or one of them runs out of cells,
+            cells of exhausted side get new component label, returns whether component was split
+        """
+        queues, seen = (deque([first]), deque([second])), ({first}, {second})
+
+        while True:
+            for side in (0, 1):
+                if not queues[side]:
+                    label = self.__labels[first]
+                    self.__members[label] -= seen[side]
+                    self.__members[self.__next_label] = seen[side]
+
+                    for cell in seen[side]:
+                        self.__labels[cell] = self.__next_label
+
+                    self.__next_label += 1
+
+                    return True
+
+                for next_index in self.__get_moves(queues[side].popleft()):
+                    if next_index in seen[1 - side]:
+                        return False
+
+                    if next_index not in seen[side]:
+                        seen[side].add(next_index)
+                        queues[side].append(next_index)
+
+    def move_start(self, x: int) -> EditResult:
+        """Moves start to the cell of the top row opening its top wall"""
+        index = self.__get_index((x, 0))
+        was_solvable = self.solvable
+
+        if index == self.__finish:
+            raise ValueError('Start and finish must differ')
+
+        self.__grid.walls[self.__start] |= Grid.TOP
+        self.__grid.types[self.__start] = 0
+        self.__grid.walls[index] &= ~Grid.TOP
+        self.__grid.types[index] = 1
+        self.__labyrinth.start_cell = (x, 0)
+
+        """Tail of shortest path is the shortest path from any of its cells"""
+        if not self.__dirty and index in self.__position:
+            self.__set_path(self.__path[self.__position[index]:])
+        else:
+            self.__invalidate()
+
+        return self.__result(was_solvable, False)
+
+    def move_finish(self, coords: Coords) -> EditResult:
+        """Moves finish to the cell"""
+        index = self.__get_index(coords)
+        was_solvable = self.solvable
+
+        if index == self.__start:
+            raise ValueError('Start and finish must differ')
+
+        self.__grid.types[self.__finish] = 0
+        self.__grid.types[index] = 2
+        self.__labyrinth.finish_cell = (coords[0], coords[1])
+
+        """Head of shortest path is the shortest path to any of its cells"""
+        if not self.__dirty and index in self.__position:
+            self.__set_path(self.__path[:self.__position[index] + 1])
+        else:
+            self.__invalidate()
+
+        return self.__result(was_solvable, False)
+
+    def solution(self) -> Solution:
+        """Returns shortest path from start to finish, raises ValueError if there is none"""
+        if not self.solvable:
+            raise ValueError('Labyrinth has no solution')
+
+        if self.__dirty:
+            solution = Solver('bidirectional').solve(self.__labyrinth)
+            self.__set_path([self.__grid.index(cell) for cell in solution])
+
+            return solution
+
+        return Solver.trace(self.__path, self.__grid.height, '2', 2)
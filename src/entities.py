@@ -1,6 +1,8 @@
 """This module contains entities used in labyrinth"""
 
+from array import array
 from dataclasses import dataclass
+from typing import Iterator
 from typing import TypeAlias
 
 
@@ -22,12 +24,297 @@ Coords: TypeAlias = tuple[int, int]
 Field: TypeAlias = list[list[Cell]]
 
 
+"""Translation tables closing one of the walls of every cell"""
+SEAL_TOP = bytes(walls | 1 for walls in range(256))
+SEAL_BOTTOM = bytes(walls | 2 for walls in range(256))
+SEAL_LEFT = bytes(walls | 4 for walls in range(256))
+SEAL_RIGHT = bytes(walls | 8 for walls in range(256))
+
+
+class Grid:
+    """
+        This class represents compact labyrinth field
+        Walls are stored as bit flags in one byte per cell, visited flags in a bitmap,
+        cell types in a signed byte array, cells are indexed by x * height + y
+    """
+    TOP = 1
+    BOTTOM = 2
+    LEFT = 4
+    RIGHT = 8
+    ALL = 15
+
+    OPPOSITE = {TOP: BOTTOM, BOTTOM: TOP, LEFT: RIGHT, RIGHT: LEFT}
+
+    __slots__ = ('width', 'height', 'walls', 'visited', 'types')
+
+    def __init__(self, width: int, height: int, walls: bytearray = None) -> None:
+        self.width = width
+        self.height = height
+        self.walls = bytearray([self.ALL]) * (width * height) if walls is None else walls
+        self.visited = bytearray((width * height + 7) >> 3)
+        self.types = array('b', bytes(width * height))
+
+    def index(self, coords: Coords) -> int:
+        """Takes cell coords, returns its flat index"""
+        return coords[0] * self.height + coords[1]
+
+    def coords(self, index: int) -> Coords:
+        """Takes flat index, returns cell coords"""
+        return divmod(index, self.height)
+
+    def offset(self, wall: int) -> int:
+        """Takes wall flag, returns flat index offset of the neighbour behind it"""
+        match wall:
+            case self.TOP:
+                return -1
+            case self.BOTTOM:
+                return 1
+            case self.LEFT:
+                return -self.height
+            case _:
+                return self.height
+
+    def neighbours(self, index: int) -> list[tuple[int, int]]:
+        """Takes flat index, returns (wall, neighbour index) pairs of cells inside the grid"""
+        x, y = divmod(index, self.height)
+        result = []
+
+        if y > 0:
+            result.append((self.TOP, index - 1))
+
+        if y < self.height - 1:
+            result.append((self.BOTTOM, index + 1))
+
+        if x > 0:
+            result.append((self.LEFT, index - self.height))
+
+        if x < self.width - 1:
+            result.append((self.RIGHT, index + self.height))
+
+        return result
+
+    def carve(self, index: int, wall: int) -> int:
+        """Removes wall of the cell along with the matching wall of its neighbour, returns neighbour index"""
+        neighbour = index + self.offset(wall)
+        self.walls[index] &= ~wall
+        self.walls[neighbour] &= ~self.OPPOSITE[wall]
+
+        return neighbour
+
+    def sealed_walls(self) -> bytearray:
+        """Returns copy of walls with closed outer borders, so moves through open walls never leave the grid"""
+        walls = bytearray(self.walls)
+        walls[::self.height] = walls[::self.height].translate(SEAL_TOP)
+        walls[self.height - 1::self.height] = walls[self.height - 1::self.height].translate(SEAL_BOTTOM)
+        walls[:self.height] = walls[:self.height].translate(SEAL_LEFT)
+        walls[-self.height:] = walls[-self.height:].translate(SEAL_RIGHT)
+
+        return walls
+
+    def is_visited(self, index: int) -> int:
+        return self.visited[index >> 3] >> (index & 7) & 1
+
+    def set_visited(self, index: int, value: int = 1) -> None:
+        if value:
+            self.visited[index >> 3] |= 1 << (index & 7)
+        else:
+            self.visited[index >> 3] &= ~(1 << (index & 7))
+
+    def clear_visited(self) -> None:
+        self.visited = bytearray(len(self.visited))
+
+    def copy(self) -> 'Grid':
+        """Returns independent copy of the grid"""
+        result = Grid(self.width, self.height, bytearray(self.walls))
+        result.visited[:] = self.visited
+        result.types = array('b', self.types)
+
+        return result
+
+    def __deepcopy__(self, memo: dict) -> 'Grid':
+        return self.copy()
+
+    @classmethod
+    def from_field(cls, field: Field) -> 'Grid':
+        """Packs list-of-Cell field into the grid"""
+        grid = cls(len(field), len(field[0]))
+
+        for x, column in enumerate(field):
+            for y, cell in enumerate(column):
+                view = grid[x][y]
+                view.top, view.bottom, view.left, view.right = cell.top, cell.bottom, cell.left, cell.right
+                view.visited, view.type = cell.visited, cell.type
+
+        return grid
+
+    def to_field(self) -> Field:
+        """Unpacks the grid into list-of-Cell field"""
+        return [
+            [
+                Cell(view.top, view.bottom, view.left, view.right, view.visited, view.type) for view in column
+            ] for column in self
+        ]
+
+    def __len__(self) -> int:
+        return self.width
+
+    def __getitem__(self, x: int) -> 'GridColumn':
+        if x < 0:
+            x += self.width
+
+        if not 0 <= x < self.width:
+            raise IndexError('Grid column index out of range')
+
+        return GridColumn(self, x)
+
+    def __iter__(self) -> Iterator['GridColumn']:
+        for x in range(self.width):
+            yield GridColumn(self, x)
+
+
+class GridColumn:
+    """Adapter exposing grid column as a sequence of cells, so grid[x][y] works as with Field"""
+    __slots__ = ('grid', 'x')
+
+    def __init__(self, grid: Grid, x: int) -> None:
+        self.grid = grid
+        self.x = x
+
+    def __len__(self) -> int:
+        return self.grid.height
+
+    def __getitem__(self, y: int) -> 'CellView':
+        if y < 0:
+            y += self.grid.height
+
+        if not 0 <= y < self.grid.height:
+            raise IndexError('Grid row index out of range')
+
+        return CellView(self.grid, self.x * self.grid.height + y)
+
+    def __iter__(self) -> Iterator['CellView']:
+        for index in range(self.x * self.grid.height, (self.x + 1) * self.grid.height):
+            yield CellView(self.grid, index)
+
+
+class CellView:
+    """Adapter exposing single grid cell with the same attributes as Cell"""
+    __slots__ = ('grid', 'index')
+
+    def __init__(self, grid: Grid, index: int) -> None:
+        self.grid = grid
+        self.index = index
+
+    def __get_wall(self, wall: int) -> int:
+        return 1 if self.grid.walls[self.index] & wall else 0
+
+    def __set_wall(self, wall: int, value: int) -> None:
+        if value:
+            self.grid.walls[self.index] |= wall
+        else:
+            self.grid.walls[self.index] &= ~wall
+
+    @property
+    def top(self) -> int:
+        return self.__get_wall(Grid.TOP)
+
+    @top.setter
+    def top(self, value: int) -> None:
+        self.__set_wall(Grid.TOP, value)
+
+    @property
+    def bottom(self) -> int:
+        return self.__get_wall(Grid.BOTTOM)
+
+    @bottom.setter
+    def bottom(self, value: int) -> None:
+        self.__set_wall(Grid.BOTTOM, value)
+
+    @property
+    def left(self) -> int:
+        return self.__get_wall(Grid.LEFT)
+
+    @left.setter
+    def left(self, value: int) -> None:
+        self.__set_wall(Grid.LEFT, value)
+
+    @property
+    def right(self) -> int:
+        return self.__get_wall(Grid.RIGHT)
+
+    @right.setter
+    def right(self, value: int) -> None:
+        self.__set_wall(Grid.RIGHT, value)
+
+    @property
+    def visited(self) -> int:
+        return self.grid.is_visited(self.index)
+
+    @visited.setter
+    def visited(self, value: int) -> None:
+        self.grid.set_visited(self.index, value)
+
+    @property
+    def type(self) -> str:
+        return str(self.grid.types[self.index])
+
+    @type.setter
+    def type(self, value: str) -> None:
+        self.grid.types[self.index] = int(value)
+
+    def __str__(self):
+        return f'{self.top}{self.bottom}{self.left}{self.right}{self.type}'
+
+
 @dataclass
 class Labyrinth:
     """This class represents labyrinth"""
     algo: str
-    field: Field
+    field: Grid | Field
     width: int
     height: int
     start_cell: Coords
     finish_cell: Coords
+    seed: int = None
+
+
+@dataclass
+class LabyrinthStream:
+    """
+        This class represents labyrinth produced row by row
+        Every row holds Grid wall flags of its cells from left to right, rows can be iterated only once
+    """
+    algo: str
+    rows: Iterator[bytearray]
+    width: int
+    height: int
+    start_cell: Coords
+    finish_cell: Coords
+    seed: int = None
+
+
+@dataclass
+class Solution:
+    """
+        This class represents labyrinth solution path
+        Cells are stored as flat x, y pairs from start to finish, codes hold path glyph code of every cell
+    """
+    cells: array
+    codes: array
+
+    @property
+    def length(self) -> int:
+        return len(self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, step: int) -> Coords:
+        if step < 0:
+            step += len(self.codes)
+
+        return self.cells[2 * step], self.cells[2 * step + 1]
+
+    def __iter__(self) -> Iterator[Coords]:
+        for step in range(len(self.codes)):
+            yield self.cells[2 * step], self.cells[2 * step + 1]
@@ -1,22 +1,48 @@
 """This module contains generating and solving algorithms"""
 
+from array import array
 from collections import deque
-from random import randint
-from random import sample
-from copy import deepcopy
-
+from contextlib import nullcontext
+from heapq import heappop
+from heapq import heappush
+from random import getrandbits
+from typing import Iterator
+
+from .analytics import DEAD_END
+from .analytics import distance_map
+from .analytics import farthest_cell
 from .entities import Coords
-from .entities import Field
-from .entities import Cell
+from .entities import Grid
 from .entities import Labyrinth
+from .entities import LabyrinthStream
+from .entities import Solution
+from .rng import RandomBuffer
+from .rng import check_seed
+from .stats import stats
 
 
 class Generator:
-    """Base class for generators"""
+    """
+        Base class for generators
+        Generator with fixed seed produces the same labyrinth on every call, otherwise every call draws a new seed
+        Finish is picked in a random dead end or in the dead end farthest from start
+        Generators carving cell by cell also offer iterator of carve events, which allows to watch progress
+        of generation or to cancel it, subclasses implement generate and optionally steps
+    """
+    finishes = ('random', 'farthest')
+
+    def __init__(self, width: int, height: int, seed: int = None, finish: str = 'random') -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError('Dimensions must be positive')
+
+        if finish not in self.finishes:
+            raise ValueError(f'No such finish selection: {finish}')
 
-    def __init__(self, width: int, height: int) -> None:
+        check_seed(seed)
         self._width = width
         self._height = height
+        self._seed = seed
+        self._finish = finish
 
     @property
     def width(self) -> int:
@@ -26,6 +52,14 @@ class Generator:
     def height(self) -> int:
         return self._height
 
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def finish(self) -> str:
+        return self._finish
+
     @width.setter
     def width(self, width: int) -> None:
         if width > 0:
@@ -48,384 +82,660 @@ class Generator:
         else:
             raise ValueError('Dimensions must be positive')
 
+    def _next_seed(self) -> int:
+        """Returns seed of the next generated labyrinth"""
+        return getrandbits(63) if self._seed is None else self._seed
+
+    def _pick_finish(self, grid: Grid, start_index: int, rng: RandomBuffer | None) -> int:
+        """
+            Takes perfect labyrinth with open start, returns index of finish cell
+            Random dead end is found by drawing cells until one has three walls, open start is never drawn,
+            farthest dead end is the farthest cell from start
+        """
+        if len(grid.walls) < 2:
+            raise ValueError('Labyrinth must contain at least two cells')
+
+        if self._finish == 'farthest':
+            return farthest_cell(distance_map(bytes(grid.sealed_walls()), grid.height, start_index))
+
+        finish_index = rng.below(len(grid.walls))
+        while not DEAD_END[grid.walls[finish_index]]:
+            finish_index = rng.below(len(grid.walls))
+
+        return finish_index
+
+    @staticmethod
+    def _complete(carving: Iterator[tuple[int, int]]) -> Labyrinth:
+        """Runs carving with events turned off to the end, it never suspends, returns its labyrinth"""
+        try:
+            next(carving)
+        except StopIteration as stop:
+            return stop.value
+
+        raise RuntimeError('Carving yielded event with events turned off')
+
+    def steps(self) -> Iterator[tuple[int, int]]:
+        """
+            Yields carve events of the next labyrinth as (cell, wall) pairs, cell is flat grid index,
+            the labyrinth is the return value of the iterator, stopping iteration cancels generation
+            Generators without step-wise carving yield no events
+        """
+        labyrinth = self.generate()
+        yield from ()
+
+        return labyrinth
+
     def generate(self) -> Labyrinth:
-        pass
+        raise NotImplementedError
 
 
 class DFSGenerator(Generator):
     """Class generating Labyrinth instances via DFS algorithm"""
 
-    def __get_valid_neighbours(self, field: Field, coords: Coords) -> list[Coords]:
-        """Takes field and one of its cells, returns valid non-visited neighbours"""
-        x_bound, y_bound = len(field), len(field[0])
-        result = []
-
-        if coords[1] > 0 and not field[coords[0]][coords[1] - 1].visited:
-            result.append((coords[0], coords[1] - 1))
-
-        if coords[1] < y_bound - 1 and not field[coords[0]][coords[1] + 1].visited:
-            result.append((coords[0], coords[1] + 1))
-
-        if coords[0] > 0 and not field[coords[0] - 1][coords[1]].visited:
-            result.append((coords[0] - 1, coords[1]))
-
-        if coords[0] < x_bound - 1 and not field[coords[0] + 1][coords[1]].visited:
-            result.append((coords[0] + 1, coords[1]))
-
-        return result
+    def __get_valid_neighbours(self, grid: Grid, index: int) -> list[tuple[int, int]]:
+        """Takes grid and one of its cells, returns (wall, index) pairs of valid non-visited neighbours"""
+        return [(wall, neighbour) for wall, neighbour in grid.neighbours(index) if not grid.is_visited(neighbour)]
 
     def generate(self) -> Labyrinth:
         """Generate Labyrinth via DFS algorithm"""
+        return self._complete(self.__carve(False))
+
+    def steps(self) -> Iterator[tuple[int, int]]:
+        """Generate Labyrinth via DFS algorithm yielding carve events"""
+        return (yield from self.__carve(True))
+
+    def __carve(self, events: bool) -> Iterator[tuple[int, int]]:
+        """
+            Carves labyrinth and returns it as the iterator value, carve events are only yielded if events are on,
+            carving phase is only timed without events, otherwise it would include time spent by the consumer
+        """
 
         """Creating field"""
-        field = [
-            [
-                Cell() for _ in range(self._height)
-            ] for _ in range(self._width)
-        ]
+        with stats.phase('allocation'):
+            grid = Grid(self._width, self._height)
+
+        seed = self._next_seed()
+        rng = RandomBuffer(seed)
 
         """Choosing initial cell"""
-        initial_cell = (randint(0, self.width - 1), 0)
+        initial_cell = (rng.below(self._width), 0)
+        initial_index = grid.index(initial_cell)
 
         """Initializing required additional data"""
-        dead_ends = []
-        path = deque()
-        met_end = 0
-
-        """Embedding initial cell"""
-        path.append(initial_cell)
-        field[initial_cell[0]][initial_cell[1]].visited = 1
-        field[initial_cell[0]][initial_cell[1]].type = '1'
-        field[initial_cell[0]][initial_cell[1]].top = 0
-
-        """DFS loop"""
-        while True:
-            curr_cell = path[-1]
-            neighbours = self.__get_valid_neighbours(field, curr_cell)
-
-            """Checking neighbours and embedding next cell"""
-            if len(neighbours) == 0:
-                if curr_cell != initial_cell:
-                    if not met_end:
-                        met_end = 1
-                        dead_ends.append(curr_cell)
-                    path.pop()
-                else:
-                    break
-            else:
-                met_end = 0
-                next_cell = sample(neighbours, 1)[0]
-
-                if curr_cell[0] < next_cell[0]:
-                    field[curr_cell[0]][curr_cell[1]].right = 0
-                    field[next_cell[0]][next_cell[1]].left = 0
-                elif curr_cell[0] > next_cell[0]:
-                    field[curr_cell[0]][curr_cell[1]].left = 0
-                    field[next_cell[0]][next_cell[1]].right = 0
-                elif curr_cell[1] < next_cell[1]:
-                    field[curr_cell[0]][curr_cell[1]].bottom = 0
-                    field[next_cell[0]][next_cell[1]].top = 0
+        path = [initial_index]
+        backtracks = 0
+
+        with stats.phase('carving') if not events else nullcontext():
+            """Embedding initial cell"""
+            grid.set_visited(initial_index)
+            grid.types[initial_index] = 1
+            grid.walls[initial_index] &= ~Grid.TOP
+
+            """DFS loop"""
+            while True:
+                curr_index = path[-1]
+                neighbours = self.__get_valid_neighbours(grid, curr_index)
+
+                """Checking neighbours and embedding next cell"""
+                if len(neighbours) == 0:
+                    if curr_index != initial_index:
+                        path.pop()
+                        backtracks += 1
+                    else:
+                        break
                 else:
-                    field[curr_cell[0]][curr_cell[1]].top = 0
-                    field[next_cell[0]][next_cell[1]].bottom = 0
+                    wall, next_index = rng.choice(neighbours)
 
-                field[next_cell[0]][next_cell[1]].visited = 1
-                path.append(next_cell)
+                    grid.carve(curr_index, wall)
+                    grid.set_visited(next_index)
+                    path.append(next_index)
+
+                    if events:
+                        yield curr_index, wall
 
         """Picking finish cell"""
-        finish_cell = sample(dead_ends, 1)[0]
-        field[finish_cell[0]][finish_cell[1]].type = '2'
+        with stats.phase('finish selection'):
+            finish_index = self._pick_finish(grid, initial_index, rng)
+            grid.types[finish_index] = 2
+
+        stats.count('cells visited', len(grid.walls))
+        stats.count('backtracks', backtracks)
 
-        return Labyrinth('dfs', field, self._width, self._height, initial_cell, finish_cell)
+        return Labyrinth('dfs', grid, self._width, self._height, initial_cell, grid.coords(finish_index), seed)
 
 
 class WilsonGenerator(Generator):
-    """Class generating Labyrinth instances via Wilson's algorithm"""
+    """
+        Class generating Labyrinth instances via Wilson's algorithm
+        Unvisited cells are kept in swap-remove array, loops are erased via per-cell next direction array
+    """
 
-    def __get_valid_neighbours(self, field: Field, coords: Coords) -> list[Coords]:
-        """Takes field and one of its cells, returns valid neighbours"""
-        x_bound, y_bound = len(field), len(field[0])
-        result = []
+    def generate(self) -> Labyrinth:
+        """Generate Labyrinth via Wilson's algorithm"""
+        return self._complete(self.__carve(False))
 
-        if coords[1] > 0 and (coords[0], coords[1] - 1):
-            result.append((coords[0], coords[1] - 1))
+    def steps(self) -> Iterator[tuple[int, int]]:
+        """Generate Labyrinth via Wilson's algorithm yielding carve events"""
+        return (yield from self.__carve(True))
 
-        if coords[1] < y_bound - 1 and (coords[0], coords[1] + 1):
-            result.append((coords[0], coords[1] + 1))
+    def __carve(self, events: bool) -> Iterator[tuple[int, int]]:
+        """
+            Carves labyrinth and returns it as the iterator value, carve events are only yielded if events are on,
+            carving phase is only timed without events, otherwise it would include time spent by the consumer
+        """
+        with stats.phase('allocation'):
+            grid = Grid(self._width, self._height)
 
-        if coords[0] > 0 and (coords[0] - 1, coords[1]):
-            result.append((coords[0] - 1, coords[1]))
+            """Unvisited cells array and positions of cells in it"""
+            unvisited = list(range(self._width * self._height))
+            position = list(range(self._width * self._height))
 
-        if coords[0] < x_bound - 1 and (coords[0] + 1, coords[1]):
-            result.append((coords[0] + 1, coords[1]))
+            """Wall crossed by the random walk for every cell"""
+            next_wall = bytearray(self._width * self._height)
 
-        return result
+            """Outer border walls of every cell, random walk redraws directions leading out of the grid"""
+            border = Grid(self._width, self._height, bytearray(self._width * self._height)).sealed_walls()
 
-    def generate(self) -> Labyrinth:
-        """Generate Labyrinth via Wilson's algorithm"""
-        field = [
-            [
-                Cell() for _ in range(self._height)
-            ] for _ in range(self._width)
-        ]
+        seed = self._next_seed()
+        rng = RandomBuffer(seed)
 
-        initial_cell = (randint(0, self._width - 1), 0)
+        initial_cell = (rng.below(self._width), 0)
+        initial_index = grid.index(initial_cell)
 
-        field[initial_cell[0]][initial_cell[1]].visited = 1
-        field[initial_cell[0]][initial_cell[1]].type = '1'
-        field[initial_cell[0]][initial_cell[1]].top = 0
+        grid.set_visited(initial_index)
+        grid.types[initial_index] = 1
+        grid.walls[initial_index] &= ~Grid.TOP
 
-        unvisited_set = {(i, j) for i in range(self._width) for j in range(self._height)}
-        unvisited_set.remove(initial_cell)
+        offsets = {wall: grid.offset(wall) for wall in (Grid.TOP, Grid.BOTTOM, Grid.LEFT, Grid.RIGHT)}
+        directions = [Grid.TOP, Grid.BOTTOM, Grid.LEFT, Grid.RIGHT]
+        moves = rng.stream(4)
 
-        dead_ends = []
+        walks = 0
 
-        while len(unvisited_set) > 0:
-            base_cell = sample(unvisited_set, 1)[0]
-            path = deque()
+        def remove_unvisited(index: int) -> None:
+            """Removes cell from unvisited array by swapping it with the last one"""
+            last_index = unvisited.pop()
 
-            dead_ends.append(base_cell)
-            path.append(base_cell)
+            if last_index != index:
+                unvisited[position[index]] = last_index
+                position[last_index] = position[index]
 
-            while True:
-                curr_cell = path[-1]
-                neighbours = self.__get_valid_neighbours(field, curr_cell)
+        remove_unvisited(initial_index)
 
-                next_cell = sample(neighbours, 1)[0]
+        with stats.phase('carving') if not events else nullcontext():
+            while len(unvisited) > 0:
+                base_index = rng.choice(unvisited)
+                walks += 1
 
-                if next_cell in path:
-                    while path[-1] != next_cell:
-                        path.pop()
-                else:
-                    path.append(next_cell)
-
-                if field[next_cell[0]][next_cell[1]].visited == 1:
-                    break
-
-            if path[-1] in dead_ends:
-                dead_ends.remove(path[-1])
-
-            while len(path) > 1:
-                curr_cell = path.popleft()
-                next_cell = path[0]
-                field[curr_cell[0]][curr_cell[1]].visited = 1
-                unvisited_set.remove(curr_cell)
-
-                if curr_cell[0] < next_cell[0]:
-                    field[curr_cell[0]][curr_cell[1]].right = 0
-                    field[next_cell[0]][next_cell[1]].left = 0
-                elif curr_cell[0] > next_cell[0]:
-                    field[curr_cell[0]][curr_cell[1]].left = 0
-                    field[next_cell[0]][next_cell[1]].right = 0
-                elif curr_cell[1] < next_cell[1]:
-                    field[curr_cell[0]][curr_cell[1]].bottom = 0
-                    field[next_cell[0]][next_cell[1]].top = 0
-                else:
-                    field[curr_cell[0]][curr_cell[1]].top = 0
-                    field[next_cell[0]][next_cell[1]].bottom = 0
+                """Random walk, revisiting a cell overwrites its wall and so erases the loop"""
+                curr_index = base_index
+                while not grid.is_visited(curr_index):
+                    wall = directions[next(moves)]
 
-        finish_cell = sample(dead_ends, 1)[0]
-        field[finish_cell[0]][finish_cell[1]].type = '2'
+                    if not border[curr_index] & wall:
+                        next_wall[curr_index] = wall
+                        curr_index += offsets[wall]
 
-        return Labyrinth('wilson', field, self._width, self._height, initial_cell, finish_cell)
+                """Embedding loop-erased walk into the labyrinth"""
+                curr_index = base_index
+                while not grid.is_visited(curr_index):
+                    grid.set_visited(curr_index)
+                    remove_unvisited(curr_index)
+                    next_index = grid.carve(curr_index, next_wall[curr_index])
+
+                    if events:
+                        yield curr_index, next_wall[curr_index]
+                    curr_index = next_index
+
+        with stats.phase('finish selection'):
+            finish_index = self._pick_finish(grid, initial_index, rng)
+            grid.types[finish_index] = 2
+
+        stats.count('cells visited', len(grid.walls))
+        stats.count('random walks', walks)
+
+        return Labyrinth('wilson', grid, self._width, self._height, initial_cell, grid.coords(finish_index), seed)
 
 
 class PrimGenerator(Generator):
     """
         Class generating Labyrinth instances via Prim's algorithm
         Edge weights are calculated by random height map
+        Frontier is kept in a binary heap, stale edges are dropped lazily on pop
     """
 
-    def __get_valid_neighbours(self, field: Field, coords: Coords) -> list[Coords]:
-        """Takes field and one of its cells, returns valid neighbours"""
-        x_bound, y_bound = len(field), len(field[0])
-        result = []
+    def __get_valid_neighbours(self, grid: Grid, index: int) -> list[tuple[int, int]]:
+        """Takes grid and one of its cells, returns (wall, index) pairs of valid non-visited neighbours"""
+        return [(wall, neighbour) for wall, neighbour in grid.neighbours(index) if not grid.is_visited(neighbour)]
+
+    def generate(self) -> Labyrinth:
+        """Generate Labyrinth via Prim's algorithm"""
+        return self._complete(self.__carve(False))
 
-        if coords[1] > 0 and not field[coords[0]][coords[1] - 1].visited:
-            result.append((coords[0], coords[1] - 1))
+    def steps(self) -> Iterator[tuple[int, int]]:
+        """Generate Labyrinth via Prim's algorithm yielding carve events"""
+        return (yield from self.__carve(True))
 
-        if coords[1] < y_bound - 1 and not field[coords[0]][coords[1] + 1].visited:
-            result.append((coords[0], coords[1] + 1))
+    def __carve(self, events: bool) -> Iterator[tuple[int, int]]:
+        """
+            Carves labyrinth and returns it as the iterator value, carve events are only yielded if events are on,
+            carving phase is only timed without events, otherwise it would include time spent by the consumer
+        """
+        seed = self._next_seed()
+        rng = RandomBuffer(seed)
 
-        if coords[0] > 0 and not field[coords[0] - 1][coords[1]].visited:
-            result.append((coords[0] - 1, coords[1]))
+        with stats.phase('allocation'):
+            grid = Grid(self._width, self._height)
 
-        if coords[0] < x_bound - 1 and not field[coords[0] + 1][coords[1]].visited:
-            result.append((coords[0] + 1, coords[1]))
+            max_weight = self._width * self._height
+            height_map = rng.integers(self._width * self._height, 1, max_weight)
 
-        return result
+        initial_index = grid.index((rng.below(self._width), rng.below(self._height)))
+        grid.set_visited(initial_index)
 
-    def generate(self) -> Labyrinth:
-        """Generate Labyrinth via Prim's algorithm"""
-        field = [
-            [
-                Cell() for _ in range(self._height)
-            ] for _ in range(self._width)
-        ]
-
-        max_weight = self._width * self._height
-        height_map = [[randint(1, max_weight)
-                       for _ in range(self._height)] for _ in range(self._width)]
-
-        initial_cell = (randint(1, self._width - 1), randint(0, self._height - 1))
-        field[initial_cell[0]][initial_cell[1]].visited = 1
-
-        possible_paths = []
-        dead_ends = []
-
-        for vertex in self.__get_valid_neighbours(field, initial_cell):
-            possible_paths.append(
-                (abs(height_map[vertex[0]][vertex[1]] - height_map[initial_cell[0]][initial_cell[1]]),
-                 initial_cell,
-                 vertex))
-
-        while len(possible_paths) > 0:
-            path = min(possible_paths)
-            curr_cell = path[1]
-            next_cell = path[2]
-
-            field[next_cell[0]][next_cell[1]].visited = 1
-            neighbours = self.__get_valid_neighbours(field, next_cell)
-
-            if curr_cell[0] < next_cell[0]:
-                field[curr_cell[0]][curr_cell[1]].right = 0
-                field[next_cell[0]][next_cell[1]].left = 0
-            elif curr_cell[0] > next_cell[0]:
-                field[curr_cell[0]][curr_cell[1]].left = 0
-                field[next_cell[0]][next_cell[1]].right = 0
-            elif curr_cell[1] < next_cell[1]:
-                field[curr_cell[0]][curr_cell[1]].bottom = 0
-                field[next_cell[0]][next_cell[1]].top = 0
-            else:
-                field[curr_cell[0]][curr_cell[1]].top = 0
-                field[next_cell[0]][next_cell[1]].bottom = 0
+        frontier = []
+        frontier_peak = 0
+        stale_edges = 0
 
-            for vertex in neighbours:
-                possible_paths.append(
-                    (abs(height_map[vertex[0]][vertex[1]] - height_map[next_cell[0]][next_cell[1]]),
-                     next_cell,
-                     vertex))
+        with stats.phase('carving') if not events else nullcontext():
+            for wall, vertex in self.__get_valid_neighbours(grid, initial_index):
+                heappush(frontier,
+                         (abs(height_map[vertex] - height_map[initial_index]), initial_index, vertex, wall))
 
-            if len(neighbours) == 0:
-                dead_ends.append(next_cell)
+            while len(frontier) > 0:
+                _, curr_index, next_index, wall = heappop(frontier)
+
+                """Skipping stale edges leading to already visited cells"""
+                if grid.is_visited(next_index):
+                    stale_edges += 1
+                    continue
 
-            possible_paths = [
-                path for path in possible_paths if field[path[2][0]][path[2][1]].visited == 0]
+                grid.set_visited(next_index)
+                grid.carve(curr_index, wall)
 
-        start_cell = (randint(0, self._width - 1), 0)
+                if events:
+                    yield curr_index, wall
+                neighbours = self.__get_valid_neighbours(grid, next_index)
 
-        field[start_cell[0]][start_cell[1]].top = 0
-        field[start_cell[0]][start_cell[1]].type = '1'
+                for wall, vertex in neighbours:
+                    heappush(frontier, (abs(height_map[vertex] - height_map[next_index]), next_index, vertex, wall))
 
-        if start_cell in dead_ends:
-            dead_ends.remove(start_cell)
+                if len(frontier) > frontier_peak:
+                    frontier_peak = len(frontier)
 
-        finish_cell = sample(dead_ends, 1)[0]
-        field[finish_cell[0]][finish_cell[1]].type = '2'
+        with stats.phase('finish selection'):
+            start_cell = (rng.below(self._width), 0)
+            start_index = grid.index(start_cell)
 
-        return Labyrinth('prim', field, self._width, self._height, start_cell, finish_cell)
+            grid.walls[start_index] &= ~Grid.TOP
+            grid.types[start_index] = 1
+
+            finish_index = self._pick_finish(grid, start_index, rng)
+            grid.types[finish_index] = 2
+
+        stats.count('cells visited', len(grid.walls))
+        stats.count('stale edges', stale_edges)
+        stats.peak('frontier peak', frontier_peak)
+
+        return Labyrinth('prim', grid, self._width, self._height, start_cell, grid.coords(finish_index), seed)
+
+
+class EllerGenerator(Generator):
+    """
+        Class generating Labyrinth instances via Eller's algorithm
+        Labyrinth is produced row by row keeping only current row set labels, so memory is O(width)
+        Start is picked in the top row and random finish in the bottom one before any row is carved,
+        farthest finish is only picked by generate once the whole labyrinth is carved
+    """
+
+    def __get_rows(self, start_cell: Coords, rng: RandomBuffer) -> Iterator[bytearray]:
+        """Yields wall flags of labyrinth rows from top to bottom"""
+        labels = list(range(self._width))
+        carried = [0] * self._width
+        coins = rng.stream(2)
+
+        for y in range(self._height):
+            walls = bytearray([Grid.ALL]) * self._width
+            last_row = y == self._height - 1
+
+            """Union-find over set labels of the current row"""
+            parent = list(range(self._width))
+
+            def find(label: int) -> int:
+                while parent[label] != label:
+                    parent[label] = parent[parent[label]]
+                    label = parent[label]
+
+                return label
+
+            for x in range(self._width):
+                if carried[x]:
+                    walls[x] &= ~Grid.TOP
+
+            if y == 0:
+                walls[start_cell[0]] &= ~Grid.TOP
+
+            """Joining adjacent cells of different sets, the last row joins all of them"""
+            for x in range(self._width - 1):
+                left_root, right_root = find(labels[x]), find(labels[x + 1])
+
+                if left_root != right_root and (last_row or next(coins)):
+                    parent[right_root] = left_root
+                    walls[x] &= ~Grid.RIGHT
+                    walls[x + 1] &= ~Grid.LEFT
+
+            if not last_row:
+                """Carving at least one cell down from every set and relabeling next row"""
+                sets = {}
+                for x in range(self._width):
+                    sets.setdefault(find(labels[x]), []).append(x)
+
+                labels = [-1] * self._width
+                carried = [0] * self._width
+
+                for label, cells in enumerate(sets.values()):
+                    down = [x for x in cells if next(coins)] or [rng.choice(cells)]
+
+                    for x in down:
+                        walls[x] &= ~Grid.BOTTOM
+                        carried[x] = 1
+                        labels[x] = label
+
+                next_label = len(sets)
+                for x in range(self._width):
+                    if labels[x] < 0:
+                        labels[x] = next_label
+                        next_label += 1
+
+            yield walls
+
+    def stream(self) -> LabyrinthStream:
+        """Returns Labyrinth which rows are generated lazily via Eller's algorithm"""
+        if self._finish != 'random':
+            raise ValueError('Streamed labyrinth supports random finish only')
+
+        return self.__open_stream()
+
+    def __open_stream(self) -> LabyrinthStream:
+        seed = self._next_seed()
+        rng = RandomBuffer(seed)
+
+        start_cell = (rng.below(self._width), 0)
+        finish_cell = (rng.below(self._width), self._height - 1)
+
+        if finish_cell == start_cell:
+            if self._width == 1:
+                raise ValueError('Labyrinth must contain at least two cells')
+
+            finish_cell = ((finish_cell[0] + rng.randint(1, self._width - 1)) % self._width, finish_cell[1])
+
+        return LabyrinthStream('eller', self.__get_rows(start_cell, rng), self._width, self._height,
+                               start_cell, finish_cell, seed)
+
+    def generate(self) -> Labyrinth:
+        """Generate Labyrinth via Eller's algorithm"""
+        stream = self.__open_stream()
+
+        with stats.phase('allocation'):
+            grid = Grid(self._width, self._height)
+
+        with stats.phase('carving'):
+            for y, walls in enumerate(stream.rows):
+                grid.walls[y::self._height] = walls
+
+        start_index, finish_index = grid.index(stream.start_cell), grid.index(stream.finish_cell)
+
+        if self._finish != 'random':
+            with stats.phase('finish selection'):
+                finish_index = self._pick_finish(grid, start_index, None)
+
+        grid.types[start_index] = 1
+        grid.types[finish_index] = 2
+        stats.count('cells visited', len(grid.walls))
+
+        return Labyrinth('eller', grid, self._width, self._height, stream.start_cell, grid.coords(finish_index),
+                         stream.seed)
 
 
 class Solver:
-    """Class solving Labyrinth via DFS"""
+    """
+        Class solving Labyrinth via one of strategies:
+        'bfs' - breadth-first search, 'astar' - A* with Manhattan heuristic,
+        'bidirectional' - BFS from both start and finish, 'dfs' - DFS in random order
+        Search state is kept in flat arrays indexed by x * height + y
+    """
+    strategies = ('bfs', 'astar', 'bidirectional', 'dfs')
+
+    __cell_codes = {'02': -1, '20': -1,
+                    '13': -2, '31': -2,
+                    '12': -3, '21': -3,
+                    '23': -4, '32': -4,
+                    '01': -5, '10': -5,
+                    '03': -6, '30': -6}
 
-    __cell_codes = {'02': '-1', '20': '-1',
-                    '13': '-2', '31': '-2',
-                    '12': '-3', '21': '-3',
-                    '23': '-4', '32': '-4',
-                    '01': '-5', '10': '-5',
-                    '03': '-6', '30': '-6'}
+    def __init__(self, strategy: str = 'bfs', seed: int = None):
+        if strategy not in self.strategies:
+            raise ValueError(f'No such solving strategy: {strategy}')
 
-    def __init__(self):
-        pass
+        check_seed(seed)
+        self.__strategy = strategy
+        self.__rng = RandomBuffer(seed)
 
-    def __get_valid_neighbours(self, field: Field, coords: Coords) -> list[Coords]:
-        """Takes field and one of its cells, returns valid neighbours"""
-        x_bound, y_bound = len(field), len(field[0])
+    @property
+    def strategy(self) -> str:
+        return self.__strategy
+
+    @staticmethod
+    def __get_moves(walls: bytearray, height: int, index: int) -> list[int]:
+        """Takes walls and one of cells, returns indices of cells reachable in one step"""
+        cell_walls = walls[index]
         result = []
 
-        if coords[1] > 0 \
-                and not field[coords[0]][coords[1] - 1].visited \
-                and not field[coords[0]][coords[1]].top:
-            result.append((coords[0], coords[1] - 1))
+        if not cell_walls & Grid.TOP:
+            result.append(index - 1)
 
-        if coords[1] < y_bound - 1 \
-                and not field[coords[0]][coords[1] + 1].visited \
-                and not field[coords[0]][coords[1]].bottom:
-            result.append((coords[0], coords[1] + 1))
+        if not cell_walls & Grid.BOTTOM:
+            result.append(index + 1)
 
-        if coords[0] > 0 \
-                and not field[coords[0] - 1][coords[1]].visited \
-                and not field[coords[0]][coords[1]].left:
-            result.append((coords[0] - 1, coords[1]))
+        if not cell_walls & Grid.LEFT:
+            result.append(index - height)
 
-        if coords[0] < x_bound - 1 \
-                and not field[coords[0] + 1][coords[1]].visited \
-                and not field[coords[0]][coords[1]].right:
-            result.append((coords[0] + 1, coords[1]))
+        if not cell_walls & Grid.RIGHT:
+            result.append(index + height)
 
         return result
 
-    def __get_relation(self, prev_cell: Coords, curr_cell: Coords, next_cell: Coords) -> str:
-        relation = ''
-
-        if prev_cell[0] < curr_cell[0]:
-            relation += '3'
-        elif prev_cell[0] > curr_cell[0]:
-            relation += '1'
-        elif prev_cell[1] < curr_cell[1]:
-            relation += '2'
-        else:
-            relation += '0'
-
-        if next_cell[0] < curr_cell[0]:
-            relation += '3'
-        elif next_cell[0] > curr_cell[0]:
-            relation += '1'
-        elif next_cell[1] < curr_cell[1]:
-            relation += '2'
-        else:
-            relation += '0'
+    def __search_bfs(self, walls: bytearray, height: int, start: int, finish: int) -> list[int]:
+        parent = array('i', [-1]) * len(walls)
+        parent[start] = start
+        queue = deque([start])
+
+        while queue:
+            curr_index = queue.popleft()
+
+            if curr_index == finish:
+                break
+
+            for next_index in self.__get_moves(walls, height, curr_index):
+                if parent[next_index] < 0:
+                    parent[next_index] = curr_index
+                    queue.append(next_index)
+
+        if stats.enabled:
+            stats.count('cells visited', len(parent) - parent.count(-1))
+
+        return self.__unwind(parent, start, finish)
+
+    def __search_astar(self, walls: bytearray, height: int, start: int, finish: int) -> list[int]:
+        finish_x, finish_y = divmod(finish, height)
+        parent = array('i', [-1]) * len(walls)
+        distance = array('i', [-1]) * len(walls)
+        parent[start] = start
+        distance[start] = 0
+        frontier = [(0, start)]
+
+        while frontier:
+            _, curr_index = heappop(frontier)
+
+            if curr_index == finish:
+                break
+
+            for next_index in self.__get_moves(walls, height, curr_index):
+                if distance[next_index] < 0 or distance[curr_index] + 1 < distance[next_index]:
+                    next_x, next_y = divmod(next_index, height)
+                    distance[next_index] = distance[curr_index] + 1
+                    parent[next_index] = curr_index
+                    heappush(frontier,
+                             (distance[next_index] + abs(next_x - finish_x) + abs(next_y - finish_y), next_index))
+
+        if stats.enabled:
+            stats.count('cells visited', len(parent) - parent.count(-1))
+
+        return self.__unwind(parent, start, finish)
+
+    def __search_bidirectional(self, walls: bytearray, height: int, start: int, finish: int) -> list[int]:
+        """Expands smaller of two BFS frontiers level by level, the level where they meet gives the shortest path"""
+        forward, backward = array('i', [-1]) * len(walls), array('i', [-1]) * len(walls)
+        forward_depth, backward_depth = array('i', [-1]) * len(walls), array('i', [-1]) * len(walls)
+        forward[start], forward_depth[start] = start, 0
+        backward[finish], backward_depth[finish] = finish, 0
+        forward_level, backward_level = [start], [finish]
+        meeting = start if start == finish else -1
+
+        while meeting < 0 and forward_level and backward_level:
+            if len(forward_level) <= len(backward_level):
+                level, parent, depth, other_depth = forward_level, forward, forward_depth, backward_depth
+            else:
+                level, parent, depth, other_depth = backward_level, backward, backward_depth, forward_depth
+
+            next_level = []
+            for curr_index in level:
+                for next_index in self.__get_moves(walls, height, curr_index):
+                    if parent[next_index] < 0:
+                        parent[next_index] = curr_index
+                        depth[next_index] = depth[curr_index] + 1
+                        next_level.append(next_index)
+
+                        if other_depth[next_index] >= 0 and (
+                                meeting < 0 or other_depth[next_index] < other_depth[meeting]):
+                            meeting = next_index
+
+            if parent is forward:
+                forward_level = next_level
+            else:
+                backward_level = next_level
 
-        return relation
+        if stats.enabled:
+            stats.count('cells visited', len(forward) - forward.count(-1) + len(backward) - backward.count(-1))
 
-    def solve(self, labyrinth: Labyrinth) -> Field:
-        """Solve Labyrinth via DFS"""
-        field = deepcopy(labyrinth.field)
-        start_cell = labyrinth.start_cell
+        if meeting < 0:
+            return []
 
-        for i in range(len(field)):
-            for j in range(len(field[0])):
-                field[i][j].visited = 0
+        path = self.__unwind(forward, start, meeting)
+        curr_index = meeting
+        while curr_index != finish:
+            curr_index = backward[curr_index]
+            path.append(curr_index)
 
-        path = deque()
+        return path
 
-        path.append(start_cell)
-        field[start_cell[0]][start_cell[1]].visited = 1
+    def __search_dfs(self, walls: bytearray, height: int, start: int, finish: int) -> list[int]:
+        visited = bytearray(len(walls))
+        visited[start] = 1
+        path = [start]
+        backtracks = 0
 
-        while True:
-            curr_cell = path[-1]
-            neighbours = self.__get_valid_neighbours(field, curr_cell)
+        while path and path[-1] != finish:
+            neighbours = [index for index in self.__get_moves(walls, height, path[-1]) if not visited[index]]
 
             if len(neighbours) == 0:
-                if curr_cell != start_cell:
-                    path.pop()
-                else:
-                    break
+                path.pop()
+                backtracks += 1
             else:
-                next_cell = sample(neighbours, 1)[0]
+                next_index = self.__rng.choice(neighbours)
+                visited[next_index] = 1
+                path.append(next_index)
+
+        if stats.enabled:
+            stats.count('cells visited', visited.count(1))
+            stats.count('backtracks', backtracks)
+
+        return path
+
+    @staticmethod
+    def __unwind(parent: array, start: int, finish: int) -> list[int]:
+        """Restores path from start to finish by parent links"""
+        if parent[finish] < 0:
+            return []
+
+        path = [finish]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+
+        return path
+
+    @staticmethod
+    def __get_side(height: int, curr_index: int, other_index: int) -> str:
+        """Returns side code of adjacent cell: '0' - bottom, '1' - right, '2' - top, '3' - left"""
+        if other_index == curr_index - height:
+            return '3'
+        elif other_index == curr_index + height:
+            return '1'
+        elif other_index == curr_index - 1:
+            return '2'
+        else:
+            return '0'
+
+    def solve(self, labyrinth: Labyrinth) -> Solution:
+        """Solve Labyrinth, returns path from start to finish along with its glyph codes"""
+        grid = labyrinth.field
+        if not isinstance(grid, Grid):
+            grid = Grid.from_field(grid)
+
+        start = grid.index(labyrinth.start_cell)
+        finish = grid.index(labyrinth.finish_cell)
+
+        search = {'bfs': self.__search_bfs,
+                  'astar': self.__search_astar,
+                  'bidirectional': self.__search_bidirectional,
+                  'dfs': self.__search_dfs}[self.__strategy]
+        with stats.phase('search'):
+            path = search(grid.sealed_walls(), grid.height, start, finish)
+
+        if len(path) == 0:
+            raise ValueError('Labyrinth has no solution')
+
+        with stats.phase('annotation'):
+            solution = self.trace(path, grid.height, '2', 2)
+
+        stats.count('path length', len(path))
+
+        return solution
+
+    @classmethod
+    def trace(cls, path: list[int], height: int, entry_side: str = None, last_code: int = None) -> Solution:
+        """
+            Takes path of flat indices, returns Solution with glyph codes of its cells
+            First cell is entered from entry_side, last cell gets last_code, by default path ends are drawn straight
+        """
+        cells = array('i')
+        codes = array('b', [0]) * len(path)
+        opposite = {'0': '2', '1': '3', '2': '0', '3': '1'}
 
-                field[next_cell[0]][next_cell[1]].visited = 1
+        for index in path:
+            cells.extend(divmod(index, height))
 
-                path.append(next_cell)
+        for i in range(len(path) if len(path) > 1 else 0):
+            next_side = cls.__get_side(height, path[i], path[i + 1]) if i < len(path) - 1 else None
+            prev_side = cls.__get_side(height, path[i], path[i - 1]) if i > 0 else entry_side
 
-                if next_cell == labyrinth.finish_cell:
-                    break
+            if prev_side is not None and prev_side == next_side:
+                prev_side = None
 
-        field[path[0][0]][path[0][1]].type = self.__cell_codes[
-            self.__get_relation((path[0][0], path[0][1] - 1), path[0], path[1])]
+            codes[i] = cls.__cell_codes[(prev_side or opposite[next_side]) + (next_side or opposite[prev_side])]
 
-        for i in range(1, len(path) - 1):
-            field[path[i][0]][path[i][1]].type = self.__cell_codes[self.__get_relation(path[i - 1], path[i], path[i + 1])]
+        if last_code is not None:
+            codes[-1] = last_code
 
-        return field
+        return Solution(cells, codes)
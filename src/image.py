@@ -0,0 +1,234 @@
+"""This module contains raster image export of labyrinths"""
+
+import struct
+import zlib
+from typing import BinaryIO
+from typing import Iterator
+
+import numpy as np
+
+from .entities import Grid
+from .entities import Labyrinth
+from .entities import Solution
+from .stats import stats
+
+"""Pixel values: walls are black, free cells are white, solution path is drawn with its own gray level"""
+WALL = 0
+PATH = 128
+FREE = 255
+
+"""PNG is written with 2-bit palette: black walls, white cells and red path, pixel values are mapped onto indices"""
+PNG_PALETTE = b'\x00\x00\x00\xff\xff\xff\xdc\x28\x28'
+PNG_INDEX = np.zeros(256, dtype=np.uint8)
+PNG_INDEX[FREE], PNG_INDEX[PATH] = 1, 2
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+class ImageExporter:
+    """
+        Class exporting labyrinths to PBM, PGM or PNG images
+        Every cell is cell_size pixels wide followed by wall_size pixels of its left wall and top wall,
+        so the image is width * (cell_size + wall_size) + wall_size pixels wide
+        Image is built band by band, one band of pixel rows per labyrinth row, from wall rows of the grid
+        by whole-array operations, so memory depends on the labyrinth width only, lab files are exported
+        straight from the memory map
+        Solution path is drawn as path_size pixels wide line through cell centers
+        PNG is compressed with the fastest zlib level, filtered scanlines leave little to gain from higher ones
+    """
+    formats = ('pbm', 'pgm', 'png')
+    png_level = 1
+
+    def __init__(self, labyrinth: Labyrinth, cell_size: int = 4, wall_size: int = 1,
+                 solution: Solution = None, path_size: int = None) -> None:
+        if cell_size <= 0 or wall_size <= 0:
+            raise ValueError('Cell and wall sizes must be positive')
+
+        path_size = max(1, cell_size // 3) if path_size is None else path_size
+
+        if not 0 < path_size <= cell_size:
+            raise ValueError('Path size must be positive and not greater than cell size')
+
+        self.__labyrinth = labyrinth
+        self.__grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+        self.__wall = wall_size
+        self.__step = cell_size + wall_size
+        self.__path_size = path_size
+        self.__path_offset = wall_size + (cell_size - path_size) // 2
+        self.__links = self.__get_links(solution)
+
+    @property
+    def width(self) -> int:
+        """Image width in pixels"""
+        return self.__labyrinth.width * self.__step + self.__wall
+
+    @property
+    def height(self) -> int:
+        """Image height in pixels"""
+        return self.__labyrinth.height * self.__step + self.__wall
+
+    @staticmethod
+    def __get_links(solution: Solution | None) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """
+            Splits solution path into path cells, links to the right neighbour, links to the upper neighbour
+            and links to the lower neighbour, every kind is (rows, columns) sorted by row
+        """
+        if solution is None or len(solution) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return {kind: (empty, empty) for kind in ('cells', 'right', 'up', 'down')}
+
+        cells = np.frombuffer(solution.cells, dtype=np.int32 if solution.cells.itemsize == 4 else np.int64)
+        xs, ys = cells[0::2].astype(np.int64), cells[1::2].astype(np.int64)
+        same_row = ys[:-1] == ys[1:]
+        vertical = ~same_row
+        lower = np.maximum(ys[:-1], ys[1:])
+
+        links = {'cells': (ys, xs),
+                 'right': (ys[:-1][same_row], np.minimum(xs[:-1], xs[1:])[same_row]),
+                 'up': (lower[vertical], xs[:-1][vertical]),
+                 'down': (lower[vertical] - 1, xs[:-1][vertical])}
+
+        for kind, (rows, columns) in links.items():
+            order = np.argsort(rows, kind='stable')
+            links[kind] = (rows[order], columns[order])
+
+        return links
+
+    def __get_row_links(self, kind: str, y: int) -> np.ndarray:
+        rows, columns = self.__links[kind]
+        return columns[np.searchsorted(rows, y):np.searchsorted(rows, y, 'right')]
+
+    def __get_span_mask(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Returns mask of image columns covered by [start, end) spans via difference array"""
+        diff = np.zeros(self.width + 1, dtype=np.int32)
+        np.add.at(diff, starts, 1)
+        np.add.at(diff, ends, -1)
+
+        return np.cumsum(diff[:-1]) > 0
+
+    def __get_walls(self, y: int) -> np.ndarray:
+        return np.frombuffer(bytes(self.__grid.walls[y::self.__grid.height]), dtype=np.uint8)
+
+    def __get_line(self, upper: np.ndarray | None, lower: np.ndarray | None) -> np.ndarray:
+        """
+            Returns pixel row of horizontal wall line between two labyrinth rows, missing row is outside
+            Junction is drawn if any of four wall segments meeting in it is drawn
+        """
+        width = self.__labyrinth.width
+        segments = (lower & Grid.TOP if lower is not None else upper & Grid.BOTTOM) > 0
+        junctions = np.zeros(width + 1, dtype=bool)
+        junctions[:-1] |= segments
+        junctions[1:] |= segments
+
+        for walls in (upper, lower):
+            if walls is not None:
+                junctions[:-1] |= (walls & Grid.LEFT) > 0
+                junctions[-1] |= (walls[-1] & Grid.RIGHT) > 0
+
+        line = np.empty((width, self.__step), dtype=np.uint8)
+        line[:, :self.__wall] = np.where(junctions[:-1], WALL, FREE)[:, None]
+        line[:, self.__wall:] = np.where(segments, WALL, FREE)[:, None]
+
+        return np.concatenate((line.ravel(), np.full(self.__wall, WALL if junctions[-1] else FREE, dtype=np.uint8)))
+
+    def __get_cells(self, walls: np.ndarray) -> np.ndarray:
+        """Returns pixel row crossing cells of the labyrinth row"""
+        cells = np.full((self.__labyrinth.width, self.__step), FREE, dtype=np.uint8)
+        cells[:, :self.__wall] = np.where(walls & Grid.LEFT, WALL, FREE)[:, None]
+
+        return np.concatenate((cells.ravel(),
+                               np.full(self.__wall, WALL if walls[-1] & Grid.RIGHT else FREE, dtype=np.uint8)))
+
+    def __draw_path(self, band: np.ndarray, y: int) -> None:
+        """Draws solution path crossing the band of labyrinth row"""
+        step, size, offset = self.__step, self.__path_size, self.__path_offset
+        cells, right = self.__get_row_links('cells', y), self.__get_row_links('right', y)
+
+        if len(cells) == 0:
+            return
+
+        """Path cells centers and horizontal links from center to center"""
+        centers = self.__get_span_mask(np.concatenate((cells * step + offset, right * step + offset)),
+                                       np.concatenate((cells * step + offset + size, (right + 1) * step + offset + size)))
+        band[offset:offset + size, centers] = PATH
+
+        """Vertical links run from the cell center to the top of the band or to its bottom"""
+        for kind, rows in (('up', slice(0, offset)), ('down', slice(offset + size, step))):
+            columns = self.__get_row_links(kind, y) * step + offset
+
+            if len(columns):
+                band[rows, (columns[:, None] + np.arange(size)).ravel()] = PATH
+
+    def bands(self) -> Iterator[np.ndarray]:
+        """Yields pixel rows of the image in bands, every labyrinth row gives band of its top wall and cells"""
+        upper = None
+
+        for y in range(self.__labyrinth.height):
+            walls = self.__get_walls(y)
+            band = np.empty((self.__step, self.width), dtype=np.uint8)
+            band[:self.__wall] = self.__get_line(upper, walls)
+            band[self.__wall:] = self.__get_cells(walls)
+            self.__draw_path(band, y)
+            upper = walls
+
+            yield band
+
+        yield np.broadcast_to(self.__get_line(upper, None), (self.__wall, self.width))
+
+    def __write_pbm(self, file: BinaryIO) -> None:
+        file.write(f'P4\n{self.width} {self.height}\n'.encode('ascii'))
+
+        for band in self.bands():
+            file.write(np.packbits(band != FREE, axis=1).tobytes())
+
+    def __write_pgm(self, file: BinaryIO) -> None:
+        file.write(f'P5\n{self.width} {self.height}\n255\n'.encode('ascii'))
+
+        for band in self.bands():
+            file.write(np.ascontiguousarray(band).tobytes())
+
+    def __write_png(self, file: BinaryIO) -> None:
+        """Writes palette PNG, compressed data of every band is written as a separate IDAT chunk"""
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(png_chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 2, 3, 0, 0, 0)))
+        file.write(png_chunk(b'PLTE', PNG_PALETTE))
+
+        compressor = zlib.compressobj(self.png_level)
+        padded = -(-self.width // 4) * 4
+        previous = np.zeros(padded // 4, dtype=np.uint8)
+
+        for band in self.bands():
+            """Four pixels are packed into a byte"""
+            indices = np.zeros((len(band), padded), dtype=np.uint8)
+            indices[:, :self.width] = PNG_INDEX[band]
+            packed = indices[:, 0::4] << 6 | indices[:, 1::4] << 4 | indices[:, 2::4] << 2 | indices[:, 3::4]
+
+            """
+                Every scanline starts with filter type byte, 2 stands for difference with the previous scanline,
+                rows of the band mostly repeat each other, so they turn into zeros compressed much faster
+            """
+            scanlines = np.empty((len(band), padded // 4 + 1), dtype=np.uint8)
+            scanlines[:, 0] = 2
+            scanlines[0, 1:] = packed[0] - previous
+            scanlines[1:, 1:] = packed[1:] - packed[:-1]
+            previous = packed[-1]
+
+            data = compressor.compress(scanlines.tobytes())
+
+            if data:
+                file.write(png_chunk(b'IDAT', data))
+
+        file.write(png_chunk(b'IDAT', compressor.flush()))
+        file.write(png_chunk(b'IEND', b''))
+
+    def write(self, file: BinaryIO, image_format: str = 'png') -> None:
+        """Writes image of the labyrinth in one of formats into binary file"""
+        if image_format not in self.formats:
+            raise ValueError(f'No such image format: {image_format}')
+
+        with stats.phase('image write'):
+            {'pbm': self.__write_pbm, 'pgm': self.__write_pgm, 'png': self.__write_png}[image_format](file)
+
+        stats.count('pixels written', self.width * self.height)
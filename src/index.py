@@ -0,0 +1,118 @@
+"""This module contains path index answering route queries on perfect labyrinths"""
+
+from array import array
+
+from .entities import Coords
+from .entities import Grid
+from .entities import Labyrinth
+from .entities import Solution
+from .generator import Solver
+
+
+class TreeIndex:
+    """
+        Class answering path queries between arbitrary cells of perfect labyrinth without search
+        Labyrinth is rooted at its start cell, every cell keeps parent, depth and jump pointer,
+        jump pointers form skew-binary ladders, so ancestor and LCA lookups take O(log n) with O(n) memory
+    """
+
+    def __init__(self, labyrinth: Labyrinth) -> None:
+        grid = labyrinth.field
+        if not isinstance(grid, Grid):
+            grid = Grid.from_field(grid)
+
+        self.__width = grid.width
+        self.__height = grid.height
+        self.__parent = parent = array('i', [-1]) * (grid.width * grid.height)
+        self.__depth = depth = array('i', [0]) * (grid.width * grid.height)
+        self.__jump = jump = array('i', [0]) * (grid.width * grid.height)
+
+        walls = grid.sealed_walls()
+        root = grid.index(labyrinth.start_cell)
+        parent[root] = jump[root] = root
+
+        """BFS order guarantees parent and its jump pointer are ready before the child"""
+        order = [root]
+        extra_edges = 0
+
+        for curr_index in order:
+            cell_walls = walls[curr_index]
+
+            for wall, next_index in ((Grid.TOP, curr_index - 1), (Grid.BOTTOM, curr_index + 1),
+                                     (Grid.LEFT, curr_index - grid.height), (Grid.RIGHT, curr_index + grid.height)):
+                if cell_walls & wall or next_index == parent[curr_index]:
+                    continue
+
+                if parent[next_index] >= 0:
+                    extra_edges += 1
+                    continue
+
+                parent[next_index] = curr_index
+                depth[next_index] = depth[curr_index] + 1
+
+                up = jump[curr_index]
+                if depth[curr_index] - depth[up] == depth[up] - depth[jump[up]]:
+                    jump[next_index] = jump[up]
+                else:
+                    jump[next_index] = curr_index
+
+                order.append(next_index)
+
+        if len(order) != len(parent) or extra_edges:
+            raise ValueError('Labyrinth is not perfect, path between cells is not unique')
+
+    def __get_index(self, coords: Coords) -> int:
+        """Takes cell coords, returns its flat index"""
+        if not (0 <= coords[0] < self.__width and 0 <= coords[1] < self.__height):
+            raise ValueError(f'Cell {coords} is out of labyrinth')
+
+        return coords[0] * self.__height + coords[1]
+
+    def __ancestor(self, index: int, depth: int) -> int:
+        """Returns ancestor of the cell lying on given depth"""
+        while self.__depth[index] > depth:
+            if self.__depth[self.__jump[index]] >= depth:
+                index = self.__jump[index]
+            else:
+                index = self.__parent[index]
+
+        return index
+
+    def __lca(self, first: int, second: int) -> int:
+        """Returns lowest common ancestor of two cells"""
+        if self.__depth[first] < self.__depth[second]:
+            first, second = second, first
+
+        first = self.__ancestor(first, self.__depth[second])
+
+        """Cells of equal depth have jump pointers of equal depth, so both climb in lockstep"""
+        while first != second:
+            if self.__jump[first] != self.__jump[second]:
+                first, second = self.__jump[first], self.__jump[second]
+            else:
+                first, second = self.__parent[first], self.__parent[second]
+
+        return first
+
+    def distance(self, first: Coords, second: Coords) -> int:
+        """Returns number of steps between two cells in O(log n)"""
+        first, second = self.__get_index(first), self.__get_index(second)
+
+        return self.__depth[first] + self.__depth[second] - 2 * self.__depth[self.__lca(first, second)]
+
+    def path(self, first: Coords, second: Coords) -> Solution:
+        """Returns path between two cells in O(length)"""
+        first, second = self.__get_index(first), self.__get_index(second)
+        lca = self.__lca(first, second)
+
+        head, tail = [first], [second]
+        while head[-1] != lca:
+            head.append(self.__parent[head[-1]])
+
+        while tail[-1] != lca:
+            tail.append(self.__parent[tail[-1]])
+
+        tail.pop()
+        tail.reverse()
+
+        return Solver.trace(head + tail, self.__height)
@@ -1,18 +1,285 @@
 """This module contains saving and loading algorithms"""
 
 import os
+import gzip
 import json
+import lzma
+import mmap
+import struct
+from array import array
 from csv import reader
 from csv import writer
+from typing import TYPE_CHECKING
+from typing import BinaryIO
+from typing import Iterator
+from typing import Sequence
+from typing import TextIO
 
-from .entities import Cell
+from .analytics import dead_ends as count_dead_ends
+from .analytics import path_length
+from .entities import Coords
+from .entities import Grid
 from .entities import Labyrinth
+from .entities import LabyrinthStream
+from .entities import SEAL_BOTTOM
+from .entities import SEAL_TOP
+from .rng import check_seed
+from .stats import stats
+
+if TYPE_CHECKING:
+    from .catalog import Catalog
+
+"""Csv cell tokens: top, bottom, left and right walls followed by cell type, type codes from -6 to 3 are list indices"""
+WALL_TOKENS = [f'{walls & 1}{walls >> 1 & 1}{walls >> 2 & 1}{walls >> 3 & 1}' for walls in range(Grid.ALL + 1)]
+TYPE_TOKENS = [str(code if code < 4 else code - 10) for code in range(10)]
+TOKEN_WALLS = {wall_token + type_token: walls
+               for walls, wall_token in enumerate(WALL_TOKENS) for type_token in TYPE_TOKENS}
+TOKEN_TYPES = {wall_token + type_token: int(type_token)
+               for wall_token in WALL_TOKENS for type_token in TYPE_TOKENS}
+
+"""
+    Binary labyrinth format: fixed header followed by wall flags of rows from top to bottom,
+    every row packs two cells per byte, low nibble holds the cell with even x
+"""
+LAB_MAGIC = b'LABY'
+LAB_VERSION = 1
+LAB_HEADER = struct.Struct('<4sHxxIIIIIIq16s')
+
+"""Translation tables packing and unpacking wall nibbles"""
+HIGH_NIBBLE = bytes((walls & 15) << 4 for walls in range(256))
+UNPACK_LOW = bytes(byte & 15 for byte in range(256))
+UNPACK_HIGH = bytes(byte >> 4 for byte in range(256))
+
+
+def pack_row(walls: bytes) -> bytes:
+    """Packs wall flags of the row into nibbles"""
+    if len(walls) % 2:
+        walls = bytes(walls) + b'\0'
+
+    packed = int.from_bytes(walls[0::2], 'little') | int.from_bytes(walls[1::2].translate(HIGH_NIBBLE), 'little')
+
+    return packed.to_bytes(len(walls) // 2, 'little')
+
+
+def unpack_row(packed: bytes, first_col: int, last_col: int) -> bytearray:
+    """Unpacks nibbles of row bytes starting from the byte holding first_col, returns walls of the columns"""
+    walls = bytearray(2 * len(packed))
+    walls[0::2] = packed.translate(UNPACK_LOW)
+    walls[1::2] = packed.translate(UNPACK_HIGH)
+
+    return walls[first_col % 2:first_col % 2 + last_col - first_col]
+
+
+def read_lab_header(buffer: bytes) -> tuple[int, int, Coords, Coords, int | None, str]:
+    """Returns width, height, start, finish, seed and algo of binary labyrinth, raises ValueError on foreign data"""
+    if len(buffer) < LAB_HEADER.size:
+        raise ValueError('Unsupported labyrinth data')
+
+    magic, version, width, height, start_x, start_y, finish_x, finish_y, seed, algo = LAB_HEADER.unpack_from(buffer)
+
+    if magic != LAB_MAGIC or version != LAB_VERSION:
+        raise ValueError('Unsupported labyrinth data')
+
+    return width, height, (start_x, start_y), (finish_x, finish_y), None if seed < 0 else seed, \
+        algo.rstrip(b'\0').decode('utf-8')
+
+
+def write_lab(file: BinaryIO, labyrinth: Labyrinth | LabyrinthStream, rows: Iterator[bytes]) -> None:
+    """Writes binary labyrinth header and packed wall rows one by one, raises ValueError on seed out of range"""
+    seed = getattr(labyrinth, 'seed', None)
+    check_seed(seed)
+
+    file.write(LAB_HEADER.pack(LAB_MAGIC, LAB_VERSION, labyrinth.width, labyrinth.height,
+                               *labyrinth.start_cell, *labyrinth.finish_cell,
+                               -1 if seed is None else seed, labyrinth.algo.encode('utf-8')))
+
+    for walls in rows:
+        file.write(pack_row(walls))
+
+
+def read_lab(buffer: bytes) -> Labyrinth:
+    """Decodes binary labyrinth held in memory, e.g. read from a pipe"""
+    width, height, start_cell, finish_cell, seed, algo = read_lab_header(buffer)
+    stride = (width + 1) // 2
+    grid = Grid(width, height)
+
+    for y in range(height):
+        offset = LAB_HEADER.size + y * stride
+        grid.walls[y::height] = unpack_row(buffer[offset:offset + stride], 0, width)
+
+    grid.types[grid.index(start_cell)] = 1
+    grid.types[grid.index(finish_cell)] = 2
+
+    return Labyrinth(algo, grid, width, height, start_cell, finish_cell, seed)
+
+
+def grid_rows(grid: Grid) -> Iterator[tuple[bytes, Sequence[int]]]:
+    """Yields (walls, types) of grid rows from top to bottom"""
+    return ((grid.walls[y::grid.height], grid.types[y::grid.height]) for y in range(grid.height))
+
+
+def write_csv(file: TextIO, labyrinth: Labyrinth | LabyrinthStream, rows: Iterator[tuple[bytes, Sequence[int]]]) -> None:
+    """Writes labyrinth header and (walls, types) rows one by one"""
+    file_writer = writer(file)
+    file_writer.writerow([labyrinth.width, labyrinth.height])
+    file_writer.writerow(labyrinth.start_cell)
+    file_writer.writerow(labyrinth.finish_cell)
+    file_writer.writerow(labyrinth.algo)
+
+    for walls, types in rows:
+        file_writer.writerow(map(str.__add__, map(WALL_TOKENS.__getitem__, walls),
+                                 map(TYPE_TOKENS.__getitem__, types)))
+
+
+def read_csv(file: TextIO) -> Labyrinth:
+    """Parses labyrinth from csv text row by row"""
+    file_reader = reader(file)
+    size, start_cell, finish_cell, algo = (next(file_reader) for _ in range(4))
+
+    labyrinth = Labyrinth(''.join(algo), None,
+                          int(size[0]), int(size[1]),
+                          (int(start_cell[0]), int(start_cell[1])),
+                          (int(finish_cell[0]), int(finish_cell[1])))
+
+    grid = Grid(labyrinth.width, labyrinth.height)
+
+    for y, row in enumerate(file_reader):
+        grid.walls[y::grid.height] = bytes(map(TOKEN_WALLS.__getitem__, row))
+        grid.types[y::grid.height] = array('b', map(TOKEN_TYPES.__getitem__, row))
+
+    labyrinth.field = grid
+
+    return labyrinth
+
+
+class MappedWalls:
+    """Read-only sequence of grid walls decoding requested cells from memory-mapped labyrinth file"""
+
+    def __init__(self, lab_file: 'LabFile') -> None:
+        self.__file = lab_file
+
+    def __len__(self) -> int:
+        return self.__file.width * self.__file.height
+
+    def __getitem__(self, key: int | slice) -> int | bytearray:
+        """Supports single cells and row slices with step equal to grid height"""
+        height = self.__file.height
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != height:
+                raise IndexError('Only row slices are supported')
+
+            return self.__file.row(start % height, start // height, (stop - 1) // height + 1)
+
+        x, y = divmod(key, height)
+        return self.__file.row(y, x, x + 1)[0]
+
+
+class MappedTypes:
+    """Read-only sequence of grid cell types, only start and finish cells are marked"""
+
+    def __init__(self, lab_file: 'LabFile') -> None:
+        self.__file = lab_file
+
+    def __len__(self) -> int:
+        return self.__file.width * self.__file.height
+
+    def __getitem__(self, key: int | slice) -> int | array:
+        indices = range(len(self))[key]
+        start = self.__file.start_cell[0] * self.__file.height + self.__file.start_cell[1]
+        finish = self.__file.finish_cell[0] * self.__file.height + self.__file.finish_cell[1]
+
+        if isinstance(key, int):
+            return 1 if key == start else (2 if key == finish else 0)
+
+        types = array('b', bytes(len(indices)))
+        for index, code in ((start, 1), (finish, 2)):
+            if index in indices:
+                types[indices.index(index)] = code
+
+        return types
+
+
+class MappedGrid(Grid):
+    """
+        Read-only grid backed by memory-mapped labyrinth file
+        Walls are decoded on access, so rendering a window of huge labyrinth never reads the whole file
+    """
+
+    def __init__(self, lab_file: 'LabFile') -> None:
+        self.width = lab_file.width
+        self.height = lab_file.height
+        self.walls = MappedWalls(lab_file)
+        self.visited = None
+        self.types = MappedTypes(lab_file)
+
+
+class LabFile:
+    """Class giving random access to rows of binary labyrinth file via mmap"""
+
+    def __init__(self, file_path: str) -> None:
+        self.__file = open(file_path, 'rb')
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.width, self.height, self.start_cell, self.finish_cell, self.seed, self.algo = \
+                read_lab_header(self.__map)
+        except ValueError:
+            self.close()
+            raise ValueError(f'Unsupported labyrinth file: {file_path}')
+
+        self.__stride = (self.width + 1) // 2
+
+    def row(self, y: int, first_col: int = 0, last_col: int = None) -> bytearray:
+        """Decodes wall flags of the row cells from first to last column"""
+        last_col = self.width if last_col is None else last_col
+        offset = LAB_HEADER.size + y * self.__stride
+
+        return unpack_row(self.__map[offset + first_col // 2:offset + (last_col + 1) // 2], first_col, last_col)
+
+    def rows(self) -> Iterator[bytearray]:
+        for y in range(self.height):
+            yield self.row(y)
+
+    def labyrinth(self) -> Labyrinth:
+        """Returns labyrinth backed by the file, suitable for viewing only"""
+        return Labyrinth(self.algo, MappedGrid(self), self.width, self.height,
+                         self.start_cell, self.finish_cell, self.seed)
+
+    def load(self) -> Labyrinth:
+        """Decodes the whole file into labyrinth"""
+        grid = Grid(self.width, self.height)
+
+        for y, walls in enumerate(self.rows()):
+            grid.walls[y::self.height] = walls
+
+        grid.types[grid.index(self.start_cell)] = 1
+        grid.types[grid.index(self.finish_cell)] = 2
+
+        return Labyrinth(self.algo, grid, self.width, self.height, self.start_cell, self.finish_cell, self.seed)
+
+    def close(self) -> None:
+        self.__map.close()
+        self.__file.close()
+
+    def __enter__(self) -> 'LabFile':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
 
 
 class Loader:
-    """Class for loading and saving app files"""
+    """
+        Class for loading and saving app files
+        Every labyrinth save is recorded in the catalog of the saves directory
+    """
+    formats = ('csv', 'csv.gz', 'csv.xz', 'lab')
+
     def __init__(self, save_path: str) -> None:
         self.__path = save_path
+        self.__catalog = None
 
     @property
     def path(self) -> str:
@@ -21,37 +288,213 @@ class Loader:
     @path.setter
     def path(self, save_path: str) -> None:
         self.__path = save_path
+        self.__catalog = None
+
+    @property
+    def catalog(self) -> 'Catalog':
+        """
+            Catalog of the saves directory, it is created on first use, so sqlite is only imported when needed,
+            saves made before the catalog existed are indexed when it is created
+        """
+        if self.__catalog is None:
+            from .catalog import Catalog
+
+            self.__catalog = Catalog(self.__path)
+
+            if self.__catalog.created:
+                self.index_saves()
+
+        return self.__catalog
+
+    def __record_save(self, labyrinth: Labyrinth | LabyrinthStream, name: str, file_format: str,
+                      dead_ends: int, solution_length: int = None) -> None:
+        """Adds saved labyrinth to the catalog"""
+        file_size = os.path.getsize(os.path.join(self.__path, f'{name}.{file_format}'))
+
+        from .catalog import SaveRecord
+
+        with stats.phase('catalog'):
+            self.catalog.add(SaveRecord(name, file_format, labyrinth.width, labyrinth.height, labyrinth.algo,
+                                        getattr(labyrinth, 'seed', None), file_size, solution_length, dead_ends))
+
+    @staticmethod
+    def __get_metadata(labyrinth: Labyrinth) -> tuple[int, int | None]:
+        """Returns dead end count and solution length of labyrinth, solution length is None for unsolvable one"""
+        grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+        solution_length = path_length(bytes(grid.sealed_walls()), grid.height,
+                                      grid.index(labyrinth.start_cell), grid.index(labyrinth.finish_cell))
+
+        return count_dead_ends(bytes(grid.sealed_walls())), solution_length
+
+    @staticmethod
+    def __count_dead_ends(rows: Iterator[bytearray], height: int, counter: list[int]) -> Iterator[bytearray]:
+        """Passes rows through adding number of their dead ends to the counter, outer borders are sealed for counting"""
+        for y, walls in enumerate(rows):
+            sealed = bytearray(walls)
+            sealed[0] |= Grid.LEFT
+            sealed[-1] |= Grid.RIGHT
+
+            if y == 0:
+                sealed = sealed.translate(SEAL_TOP)
+            if y == height - 1:
+                sealed = sealed.translate(SEAL_BOTTOM)
+
+            counter[0] += count_dead_ends(bytes(sealed))
+            yield walls
+
+    def __open_csv(self, name: str, mode: str, compression: str = None) -> TextIO:
+        """Opens csv file for text reading or writing, compression is picked by file extension"""
+        file_path = os.path.join(self.__path, f'{name}.csv' + (f'.{compression}' if compression else ''))
+
+        match compression:
+            case None:
+                return open(file_path, mode, encoding='utf-8')
+            case 'gz':
+                return gzip.open(file_path, mode + 't', encoding='utf-8')
+            case 'xz':
+                return lzma.open(file_path, mode + 't', encoding='utf-8')
+            case _:
+                raise ValueError(f'No such compression: {compression}')
+
+    def find_labyrinth_csv(self, name: str) -> str | None:
+        """Returns compression of existing csv save: '' for plain csv, 'gz', 'xz' or None if there is no save"""
+        for compression in ('', 'gz', 'xz'):
+            if os.path.isfile(os.path.join(self.__path, f'{name}.csv' + (f'.{compression}' if compression else ''))):
+                return compression
+
+        return None
+
+    def __write_csv(self, labyrinth: Labyrinth | LabyrinthStream, rows: Iterator[tuple[bytes, Sequence[int]]],
+                    name: str, compression: str) -> None:
+        """Writes labyrinth header and (walls, types) rows one by one"""
+
+        with stats.phase('csv write'):
+            os.makedirs(self.__path, exist_ok=True)
+            with self.__open_csv(name, 'w', compression) as file:
+                write_csv(file, labyrinth, rows)
+
+        stats.count('rows written', labyrinth.height)
+
+    def save_labyrinth_csv(self, labyrinth: Labyrinth, name: str, compression: str = None) -> None:
+        """Saves labyrinth in csv file row by row, compression may be 'gz' or 'xz'"""
+        grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+
+        self.__write_csv(labyrinth, grid_rows(grid), name, compression)
+        self.__record_save(labyrinth, name, 'csv' + (f'.{compression}' if compression else ''),
+                           *self.__get_metadata(labyrinth))
+
+    def save_labyrinth_stream(self, stream: LabyrinthStream, name: str, compression: str = None) -> None:
+        """Saves labyrinth in csv file consuming its rows one by one"""
+
+        dead_ends = [0]
+
+        def get_rows() -> Iterator[tuple[bytes, Sequence[int]]]:
+            for y, walls in enumerate(self.__count_dead_ends(stream.rows, stream.height, dead_ends)):
+                types = array('b', bytes(stream.width))
+
+                if y == stream.start_cell[1]:
+                    types[stream.start_cell[0]] = 1
+
+                if y == stream.finish_cell[1]:
+                    types[stream.finish_cell[0]] = 2
+
+                yield walls, types
+
+        self.__write_csv(stream, get_rows(), name, compression)
+        self.__record_save(stream, name, 'csv' + (f'.{compression}' if compression else ''), dead_ends[0])
+
+    def load_labyrinth_csv(self, name: str, compression: str = None) -> Labyrinth:
+        """
+            Loads labyrinth from csv file parsing it row by row
+            Compression is found automatically if it is not given, '' stands for plain csv
+        """
+        with stats.phase('csv read'):
+            if compression is None:
+                compression = self.find_labyrinth_csv(name)
+
+            with self.__open_csv(name, 'r', compression or None) as file:
+                labyrinth = read_csv(file)
+                stats.count('rows read', labyrinth.height)
+
+                return labyrinth
+
+    def save_labyrinth_lab(self, labyrinth: Labyrinth | LabyrinthStream, name: str) -> None:
+        """Saves labyrinth or labyrinth stream in binary lab file"""
+
+        dead_ends, solution_length = [0], None
+
+        if isinstance(labyrinth, LabyrinthStream):
+            rows = self.__count_dead_ends(labyrinth.rows, labyrinth.height, dead_ends)
+        else:
+            dead_ends[0], solution_length = self.__get_metadata(labyrinth)
+            grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+            rows = (grid.walls[y::grid.height] for y in range(grid.height))
+
+        """Seed is checked before the file is created, so a rejected save leaves no empty file behind"""
+        check_seed(getattr(labyrinth, 'seed', None))
+
+        with stats.phase('lab write'):
+            os.makedirs(self.__path, exist_ok=True)
+            with open(os.path.join(self.__path, f'{name}.lab'), 'wb') as file:
+                write_lab(file, labyrinth, rows)
+
+        stats.count('rows written', labyrinth.height)
+        self.__record_save(labyrinth, name, 'lab', dead_ends[0], solution_length)
+
+    def open_labyrinth_lab(self, name: str) -> LabFile:
+        """Opens binary lab file for random access to its rows"""
+        return LabFile(os.path.join(self.__path, f'{name}.lab'))
+
+    def load_labyrinth_lab(self, name: str) -> Labyrinth:
+        """Loads labyrinth from binary lab file"""
+        with stats.phase('lab read'), self.open_labyrinth_lab(name) as lab_file:
+            return lab_file.load()
+
+    @classmethod
+    def split_save_name(cls, file: str) -> tuple[str, str] | None:
+        """Returns name and format of the save file, None for other files, dotted names keep their dots"""
+        for file_format in sorted(cls.formats, key=len, reverse=True):
+            if file.endswith(f'.{file_format}') and len(file) > len(file_format) + 1:
+                return file[:-len(file_format) - 1], file_format
+
+        return None
+
+    def index_saves(self) -> tuple[int, int]:
+        """
+            Brings the catalog in line with the saves directory: adds saves missing in it, such as ones made
+            before it existed, and removes records of deleted saves, returns numbers of added and removed saves
+        """
+        cataloged = {(record.name, record.format) for record in self.catalog.select()}
+        existing = set()
+        added = 0
 
-    def save_labyrinth_csv(self, labyrinth: Labyrinth, name: str) -> None:
-        """Saves labyrinth in csv file"""
+        for file in sorted(os.listdir(self.__path)):
+            save = self.split_save_name(file)
 
-        os.makedirs(self.__path, exist_ok=True)
-        with open(os.path.join(self.__path, f'{name}.csv'), 'w', encoding='utf-8') as file:
-            file_writer = writer(file)
-            file_writer.writerow([labyrinth.width, labyrinth.height])
-            file_writer.writerow(labyrinth.start_cell)
-            file_writer.writerow(labyrinth.finish_cell)
-            file_writer.writerow(labyrinth.algo)
+            if save is None:
+                continue
 
-            for row in zip(*labyrinth.field):
-                file_writer.writerow(row)
+            name, file_format = save
+            existing.add((name, file_format))
+            if (name, file_format) in cataloged:
+                continue
 
-    def load_labyrinth_csv(self, name: str) -> Labyrinth:
-        """Loads labyrinth from csv file"""
+            """Files which can not be read as labyrinths are not saves of the app, they are skipped"""
+            try:
+                if file_format == 'lab':
+                    labyrinth = self.load_labyrinth_lab(name)
+                else:
+                    labyrinth = self.load_labyrinth_csv(name, file_format[4:])
+            except (ValueError, OSError, RuntimeError, KeyError, IndexError):
+                continue
 
-        with open(os.path.join(self.__path, f'{name}.csv'), 'r', encoding='utf-8') as file:
-            file_reader = list(reader(file))
-            labyrinth = Labyrinth(''.join(file_reader[3]), [],
-                                  int(file_reader[0][0]), int(file_reader[0][1]),
-                                  (int(file_reader[1][0]), int(file_reader[1][1])),
-                                  (int(file_reader[2][0]), int(file_reader[2][1])))
+            self.__record_save(labyrinth, name, file_format, *self.__get_metadata(labyrinth))
+            added += 1
 
-            for column in zip(*file_reader[4:]):
-                labyrinth.field.append([Cell(int(i[0]), int(i[1]),
-                                             int(i[2]), int(i[3]),
-                                             0, i[4]) for i in column])
+        for name, file_format in cataloged - existing:
+            self.catalog.remove(name, file_format)
 
-            return labyrinth
+        return added, len(cataloged - existing)
 
     def load_json(self, name: str) -> dict:
         """Loads json conf files"""
@@ -1,15 +1,43 @@
 """This module contains printing algorithm"""
 
+import sys
 from termcolor import colored
+from typing import Iterator
+from typing import Sequence
+from typing import TextIO
+from .entities import Grid
 from .entities import Labyrinth
+from .entities import LabyrinthStream
+from .entities import Solution
+from .stats import stats
 from copy import deepcopy
 
+"""Translation tables extracting junction key bits from cell walls"""
+EAST_SOUTH = bytes((walls & Grid.TOP) << 1 | (walls & Grid.LEFT) >> 2 for walls in range(256))
+WEST = bytes((walls & Grid.TOP) << 3 for walls in range(256))
+NORTH = bytes(walls & Grid.LEFT for walls in range(256))
+TOP_ROW = bytes(key | 32 for key in range(256))
+
 
 class Printer:
-    """Class for printing labyrinths in console"""
-    def __init__(self, labyrinth: Labyrinth, conf: dict, styles: dict):
+    """
+        Class for printing labyrinths in console
+        Junction glyphs are precompiled into a table indexed by wall bits, every frame is written at once,
+        huge labyrinths are written in chunks of rows
+        Labyrinth streams are printed row by row, keeping only the previous row in memory
+        Solution path is drawn as an overlay on top of labyrinth cells
+    """
+    chunk_size = 1 << 20
+
+    def __init__(self, labyrinth: Labyrinth | LabyrinthStream, conf: dict, styles: dict, solution: Solution = None):
         self.__labyrinth = labyrinth
 
+        """Solution path overlay grouped by rows"""
+        self.__overlay = {}
+        if solution is not None:
+            for (x, y), code in zip(solution, solution.codes):
+                self.__overlay.setdefault(y, []).append((x, code))
+
         self.__border = deepcopy(styles['border'][conf['BORDER_STYLE']])
         self.__path = deepcopy(styles['path'][conf['PATH_STYLE']])
 
@@ -23,66 +51,187 @@ class Printer:
                             '2': colored(conf['FINISH'], conf['FINISH_COLOR']),
                             '3': colored(conf['ENTRY'], conf['ENTRY_COLOR'])})
 
-    def print_labyrinth(self) -> None:
-        """Takes labyrinth and prints it into shell"""
-
-        print(f'Labyrinth size: {self.__labyrinth.width}x{self.__labyrinth.height}')
-        print(f'Start cell: {self.__labyrinth.start_cell}')
-        print(f'Finish cell: {self.__labyrinth.finish_cell}')
-        print(f'Algo: {self.__labyrinth.algo}', '\n')
-
-        for j in range(self.__labyrinth.width):
-            print(' ', self.__path['3'] if (j, 0) == self.__labyrinth.start_cell else ' ', sep='', end='')
-        print(' ')
-
-        for i in range(self.__labyrinth.height):
-            if i == 0:
-                for j in range(self.__labyrinth.width):
-                    if j == 0:
-                        print(self.__border['1100'
-                                            + str(self.__labyrinth.field[j][i].top)
-                                            + str(self.__labyrinth.field[j][i].left)],
-                              self.__border['101010'] if self.__labyrinth.field[j][i].top else ' ',
-                              sep='', end='')
-                    else:
-                        print(self.__border['10'
-                                            + str(self.__labyrinth.field[j - 1][i].top)
-                                            + '0' + str(self.__labyrinth.field[j][i].top)
-                                            + str(self.__labyrinth.field[j][i].left)],
-                              self.__border['101010'] if self.__labyrinth.field[j][i].top else ' ',
-                              sep='', end='')
-
-                print(self.__border['001001'] if self.__labyrinth.field[-1][i].top else self.__border['010101'])
-
-            else:
-                for j in range(self.__labyrinth.width):
-                    if j == 0:
-                        print(self.__border['010'
-                                            + str(self.__labyrinth.field[j][i - 1].left)
-                                            + str(self.__labyrinth.field[j][i].top)
-                                            + str(self.__labyrinth.field[j][i].left)],
-                              self.__border['101010'] if self.__labyrinth.field[j][i].top else ' ',
-                              sep='', end='')
-                    else:
-                        print(self.__border['00'
-                                            + str(self.__labyrinth.field[j - 1][i].top)
-                                            + str(self.__labyrinth.field[j][i - 1].left)
-                                            + str(self.__labyrinth.field[j][i].top)
-                                            + str(self.__labyrinth.field[j][i].left)],
-                              self.__border['101010'] if self.__labyrinth.field[j][i].top else ' ',
-                              sep='', end='')
-
-                print(self.__border['001101'] if self.__labyrinth.field[-1][i].top else self.__border['010101'])
-
-            for j in range(self.__labyrinth.width):
-                print(self.__border['010101'] if self.__labyrinth.field[j][i].left else ' ',
-                      self.__path[self.__labyrinth.field[j][i].type],
-                      sep='', end='')
-            print(self.__border['010101'])
-
-        for j in range(self.__labyrinth.width):
-            print(self.__border['000110'] if j == 0 else (
-                self.__border['001110'] if self.__labyrinth.field[j][-1].left else self.__border['101010']),
-                  self.__border['101010'],
-                  sep='', end='')
-        print(self.__border['001100'])
+        """
+            Junction key bits: top row, left column, west, north, east and south wall segments
+            Every piece of horizontal border line is a junction followed by east segment of the cell
+        """
+        segment = self.__border['101010']
+        self.__junctions = [self.__border.get(f'{key:06b}', ' ') for key in range(64)]
+        self.__pieces = [self.__border.get(f'{key:06b}', ' ') + (segment if key & 2 else ' ') for key in range(64)]
+
+        """Left wall and type glyphs, type codes from -6 to 3 are valid list indices"""
+        self.__lefts = [self.__border['010101'] if walls & Grid.LEFT else ' ' for walls in range(256)]
+        self.__glyphs = [self.__path[str(code if code < 4 else code - 10)] for code in range(10)]
+
+    def __get_rows(self, first_row: int, last_row: int,
+                   first_col: int, last_col: int) -> Iterator[tuple[int, Sequence[int], Sequence[int]]]:
+        """Yields (index, walls, types) of labyrinth rows from first to last one clipped to the columns"""
+        if isinstance(self.__labyrinth, LabyrinthStream):
+            start_cell, finish_cell = self.__labyrinth.start_cell, self.__labyrinth.finish_cell
+
+            for i, walls in enumerate(self.__labyrinth.rows):
+                if i < first_row:
+                    continue
+
+                if i >= last_row:
+                    break
+
+                types = [0] * self.__labyrinth.width
+
+                if i == start_cell[1]:
+                    types[start_cell[0]] = 1
+
+                if i == finish_cell[1]:
+                    types[finish_cell[0]] = 2
+
+                yield i, walls[first_col:last_col], self.__apply_overlay(i, types[first_col:last_col], first_col)
+        else:
+            grid = self.__labyrinth.field
+            if not isinstance(grid, Grid):
+                grid = Grid.from_field(grid)
+
+            for i in range(first_row, last_row):
+                cells = slice(first_col * grid.height + i, (last_col - 1) * grid.height + i + 1, grid.height)
+                yield i, grid.walls[cells], self.__apply_overlay(i, grid.types[cells], first_col)
+
+    def __apply_overlay(self, i: int, types: Sequence[int], first_col: int) -> Sequence[int]:
+        """Takes row index and its cell types starting from the column, returns types with solution path glyph codes"""
+        for x, code in self.__overlay.get(i, ()):
+            if 0 <= x - first_col < len(types):
+                types[x - first_col] = code
+
+        return types
+
+    def __render_border(self, prev_walls: bytes, walls: bytes, top_row: int, left_edge: int, right_edge: int) -> str:
+        """
+            Renders horizontal border line above the row, prev_walls belong to the row above
+            Rows contain one extra cell on every side which is not a labyrinth edge, only its junction is drawn
+        """
+        width = len(walls)
+
+        """Bitwise OR of whole rows is done on big integers, west bits are shifted by one cell"""
+        keys = int.from_bytes(walls.translate(EAST_SOUTH), 'big') \
+            | int.from_bytes(b'\0' + walls[:-1].translate(WEST), 'big')
+
+        if not top_row:
+            keys |= int.from_bytes(prev_walls.translate(NORTH), 'big')
+
+        keys = bytearray(keys.to_bytes(width, 'big'))
+
+        if left_edge:
+            keys[0] |= 16
+
+        if top_row:
+            keys = keys.translate(TOP_ROW)
+
+        if not right_edge:
+            end = self.__junctions[keys.pop()]
+        elif walls[-1] & Grid.TOP:
+            end = self.__border['001001' if top_row else '001101']
+        else:
+            end = self.__border['010101']
+
+        return ''.join(map(self.__pieces.__getitem__, keys[0 if left_edge else 1:])) + end + '\n'
+
+    def __render_cells(self, walls: bytes, types: Sequence[int], right_edge: int) -> str:
+        """Renders line of the row cells, walls may contain one extra cell on the right which is not drawn"""
+        end = self.__border['010101'] if right_edge else self.__lefts[walls[-1]]
+
+        return ''.join(map(str.__add__,
+                           map(self.__lefts.__getitem__, walls),
+                           map(self.__glyphs.__getitem__, types))) + end + '\n'
+
+    def __render_bottom(self, walls: bytes, left_edge: int, right_edge: int) -> str:
+        """Renders bottom border line of the labyrinth"""
+        segment = self.__border['101010']
+        junctions = [self.__border['001110'] if cell_walls & Grid.LEFT else segment for cell_walls in walls]
+
+        if left_edge:
+            junctions[0] = self.__border['000110']
+        else:
+            junctions.pop(0)
+
+        end = self.__border['001100'] if right_edge else junctions.pop()
+
+        return segment.join(junctions) + segment + end + '\n'
+
+    def __render(self, window: tuple[int, int, int, int]) -> Iterator[str]:
+        """Yields rendered header and frame lines of the window given as (x, y, width, height)"""
+        x, y, width, height = window
+
+        yield f'Labyrinth size: {self.__labyrinth.width}x{self.__labyrinth.height}\n'
+        yield f'Start cell: {self.__labyrinth.start_cell}\n'
+        yield f'Finish cell: {self.__labyrinth.finish_cell}\n'
+        yield f'Algo: {self.__labyrinth.algo} \n'
+
+        if window != (0, 0, self.__labyrinth.width, self.__labyrinth.height):
+            yield f'Viewport: {(x, y)} {width}x{height}\n'
+
+        yield '\n'
+        yield from self.render_frame(*window)
+
+    def render_frame(self, x: int, y: int, width: int, height: int) -> Iterator[str]:
+        """
+            Yields rendered frame lines of the window without header: entry line if the window touches the top,
+            then border line and cells line of every row and border line below the last one
+        """
+        left_edge, right_edge = x == 0, x + width == self.__labyrinth.width
+        first_col, last_col = max(x - 1, 0), min(x + width + 1, self.__labyrinth.width)
+        skip = x - first_col
+
+        if y == 0:
+            yield ''.join(' ' + (self.__path['3'] if (j, 0) == self.__labyrinth.start_cell else ' ')
+                          for j in range(x, x + width)) + ' \n'
+
+        prev_walls = None
+
+        for i, walls, types in self.__get_rows(max(y - 1, 0), min(y + height + 1, self.__labyrinth.height),
+                                               first_col, last_col):
+            walls = bytes(walls)
+
+            if i >= y:
+                yield self.__render_border(prev_walls, walls, i == 0, left_edge, right_edge)
+
+            if i == y + height:
+                break
+
+            if i >= y:
+                yield self.__render_cells(walls[skip:], types[skip:skip + width], right_edge)
+
+            prev_walls = walls
+        else:
+            yield self.__render_bottom(prev_walls, left_edge, right_edge)
+
+    def print_labyrinth(self, file: TextIO = None) -> None:
+        """Takes labyrinth and prints it into shell or given text file"""
+        self.print_viewport(0, 0, self.__labyrinth.width, self.__labyrinth.height, file)
+
+    def print_viewport(self, x: int, y: int, width: int, height: int, file: TextIO = None) -> None:
+        """
+            Prints only window of the labyrinth with top left cell (x, y), window is clipped by labyrinth borders
+            Rendering cost depends on the window size only, except for streams which are read up to the window
+        """
+        if not (0 <= x < self.__labyrinth.width and 0 <= y < self.__labyrinth.height and width > 0 and height > 0):
+            raise ValueError('Viewport is out of labyrinth')
+
+        window = (x, y, min(width, self.__labyrinth.width - x), min(height, self.__labyrinth.height - y))
+
+        file = sys.stdout if file is None else file
+        chunk, chunk_length = [], 0
+        chunks = 1
+
+        with stats.phase('render'):
+            for line in self.__render(window):
+                chunk.append(line)
+                chunk_length += len(line)
+
+                if chunk_length >= self.chunk_size:
+                    file.write(''.join(chunk))
+                    chunk, chunk_length = [], 0
+                    chunks += 1
+
+            file.write(''.join(chunk))
+            file.flush()
+
+        stats.count('cells rendered', window[2] * window[3])
+        stats.count('chunks written', chunks)
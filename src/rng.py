@@ -0,0 +1,72 @@
+"""This module contains seeded random number source with bulk prefetch"""
+
+from array import array
+from random import Random
+from typing import Iterator
+
+"""Seeds are stored as signed 64-bit integers, so they are limited to non-negative 63-bit values"""
+SEED_LIMIT = 2 ** 63
+
+
+def check_seed(seed: int | None) -> None:
+    """Raises ValueError if the seed can not be stored with the labyrinth"""
+    if seed is not None and not 0 <= seed < SEED_LIMIT:
+        raise ValueError('Seed must be in range [0, 2 ** 63)')
+
+
+class RandomBuffer:
+    """
+        Seeded random number source drawing 32-bit values in bulk
+        Every block of values is produced by a single getrandbits call of random.Random,
+        so hot loops pay for a buffer lookup instead of a full random module call
+    """
+    block_size = 4096
+
+    def __init__(self, seed: int = None) -> None:
+        self.__random = Random(seed)
+        self.__buffer = array('I')
+        self.__position = 0
+
+    def __draw(self, size: int) -> array:
+        """Returns array of size random 32-bit values produced by one call"""
+        return array('I', self.__random.getrandbits(32 * size).to_bytes(4 * size, 'little'))
+
+    def __refill(self, size: int) -> None:
+        self.__buffer = self.__draw(size)
+        self.__position = 0
+
+    def below(self, bound: int) -> int:
+        """Returns random integer in range [0, bound), bound must be positive and not exceed 2 ** 32"""
+        if bound <= 0:
+            raise ValueError('Bound must be positive')
+
+        if self.__position == len(self.__buffer):
+            self.__refill(self.block_size)
+
+        value = self.__buffer[self.__position]
+        self.__position += 1
+
+        return value * bound >> 32
+
+    def randint(self, low: int, high: int) -> int:
+        """Returns random integer in range [low, high]"""
+        return low + self.below(high - low + 1)
+
+    def choice(self, sequence):
+        """Returns random element of non-empty sequence"""
+        return sequence[self.below(len(sequence))]
+
+    def stream(self, bound: int) -> Iterator[int]:
+        """Yields endless random integers in range [0, bound) drawn block by block"""
+        while True:
+            yield from (value * bound >> 32 for value in self.__draw(self.block_size))
+
+    def integers(self, count: int, low: int, high: int) -> list[int]:
+        """Returns count random integers in range [low, high] drawn at once"""
+        bound = high - low + 1
+
+        return [low + (value * bound >> 32) for value in (self.__draw(count) if count else ())]
+
+    def getrandbits(self, bits: int) -> int:
+        """Returns integer with given number of random bits, used to seed other generators"""
+        return self.__random.getrandbits(bits)
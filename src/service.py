@@ -0,0 +1,385 @@
+"""
+    This module contains local asyncio HTTP/JSON labyrinth service
+    Usage: python -m src.service [--host HOST] [--port PORT] [--workers K] [--maps DIR]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+
+from .entities import Grid
+from .entities import Labyrinth
+from .generator import DFSGenerator
+from .generator import EllerGenerator
+from .generator import PrimGenerator
+from .generator import Solver
+from .generator import WilsonGenerator
+from .loader import Loader
+from .printer import Printer
+from .vectorized import BinaryTreeGenerator
+from .vectorized import SidewinderGenerator
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+generators = {'dfs': DFSGenerator, 'wilson': WilsonGenerator, 'prim': PrimGenerator,
+              'eller': EllerGenerator, 'binary': BinaryTreeGenerator, 'sidewinder': SidewinderGenerator}
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class WorkerError(Exception):
+    """Unexpected failure of a job or of the worker process, it is answered with 500 instead of 400"""
+
+
+def encode_labyrinth(labyrinth: Labyrinth) -> dict:
+    """Returns JSON object of labyrinth, walls are Grid wall flags in x * height + y order encoded with base64"""
+    grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+
+    return {'algo': labyrinth.algo, 'width': labyrinth.width, 'height': labyrinth.height,
+            'start': list(labyrinth.start_cell), 'finish': list(labyrinth.finish_cell), 'seed': labyrinth.seed,
+            'walls': base64.b64encode(grid.walls).decode('ascii')}
+
+
+def decode_labyrinth(data: dict) -> Labyrinth:
+    """Takes JSON object made by encode_labyrinth, returns labyrinth"""
+    try:
+        width, height = int(data['width']), int(data['height'])
+        walls = bytearray(base64.b64decode(data['walls'], validate=True))
+        start_cell, finish_cell = tuple(map(int, data['start'])), tuple(map(int, data['finish']))
+    except (KeyError, TypeError, ValueError) as err:
+        raise ValueError(f'Malformed labyrinth: {err}')
+
+    if width <= 0 or height <= 0 or len(walls) != width * height:
+        raise ValueError('Malformed labyrinth: walls do not match dimensions')
+
+    for x, y in (start_cell, finish_cell):
+        if not (0 <= x < width and 0 <= y < height):
+            raise ValueError('Malformed labyrinth: start or finish is out of labyrinth')
+
+    grid = Grid(width, height, walls)
+    grid.types[grid.index(start_cell)] = 1
+    grid.types[grid.index(finish_cell)] = 2
+
+    return Labyrinth(str(data.get('algo', '')), grid, width, height, start_cell, finish_cell, data.get('seed'))
+
+
+def get_name(request: dict) -> str:
+    """Returns save name of the request, names leading out of the saves directory are rejected"""
+    name = str(request['name'])
+
+    if not name or '..' in name or any(sep in name for sep in ('/', '\\', os.sep, os.altsep) if sep):
+        raise ValueError(f'Invalid save name: {name}')
+
+    return name
+
+
+def resolve_labyrinth(request: dict, save_path: str) -> Labyrinth:
+    """Returns labyrinth given inline by request or by name of the save"""
+    if 'labyrinth' in request:
+        return decode_labyrinth(request['labyrinth'])
+
+    if 'name' not in request:
+        raise ValueError('Either labyrinth or name must be given')
+
+    loader, name = Loader(save_path), get_name(request)
+
+    if os.path.isfile(os.path.join(save_path, f'{name}.lab')):
+        return loader.load_labyrinth_lab(name)
+
+    if loader.find_labyrinth_csv(name) is not None:
+        return loader.load_labyrinth_csv(name)
+
+    raise ValueError(f'Labyrinth \'{name}\' does not exist')
+
+
+def run_generate(request: dict, save_path: str) -> dict:
+    """Generates labyrinth and optionally saves it, runs inside worker process"""
+    if request.get('algo', 'dfs') not in generators:
+        raise ValueError(f'No such generation algorithm: {request.get("algo")}')
+
+    name = get_name(request) if 'name' in request else None
+
+    labyrinth = generators[request.get('algo', 'dfs')](int(request['width']), int(request['height']),
+                                                        request.get('seed'),
+                                                        request.get('finish', 'random')).generate()
+
+    if name is not None:
+        Loader(save_path).save_labyrinth_lab(labyrinth, name)
+
+    return encode_labyrinth(labyrinth)
+
+
+def run_solve(request: dict, save_path: str) -> dict:
+    """Solves labyrinth, runs inside worker process"""
+    solution = Solver(request.get('strategy', 'bfs'), request.get('seed')).solve(resolve_labyrinth(request, save_path))
+
+    return {'length': solution.length, 'path': [list(cell) for cell in solution]}
+
+
+def run_load(request: dict, save_path: str) -> dict:
+    """Loads labyrinth save, runs inside worker process"""
+    return encode_labyrinth(resolve_labyrinth(request, save_path))
+
+
+def run_render(request: dict, save_path: str, conf: dict, styles: dict) -> str:
+    """Renders labyrinth with optional solution into text, runs inside worker process"""
+    labyrinth = resolve_labyrinth(request, save_path)
+    solution = Solver(request.get('strategy', 'bfs')).solve(labyrinth) if request.get('solve') else None
+    viewport = request.get('viewport') or (0, 0, labyrinth.width, labyrinth.height)
+    text = io.StringIO()
+
+    Printer(labyrinth, conf, styles, solution).print_viewport(*map(int, viewport), file=text)
+
+    return text.getvalue()
+
+
+def run_batch(jobs: list[tuple[Callable, tuple]]) -> list[tuple[int, Any]]:
+    """
+        Runs several small jobs in one worker call, returns (status, result or error message) pairs,
+        failure of one job never affects the others
+    """
+    results = []
+
+    for function, args in jobs:
+        try:
+            results.append((200, function(*args)))
+        except (KeyError, TypeError, ValueError) as err:
+            results.append((400, str(err)))
+        except Exception as err:
+            results.append((500, repr(err)))
+
+    return results
+
+
+class LabService:
+    """
+        Class serving labyrinth generation, solving, loading and rendering over HTTP with JSON bodies
+        Endpoints are POST /generate, /solve, /load, /render and GET /health
+        Every job runs in a process pool, jobs on labyrinths smaller than batch_cells cells are collected
+        for batch_delay seconds or up to batch_size jobs and sent to a worker at once,
+        so many tiny requests do not pay process pool round trip each
+    """
+    max_body = 64 << 20
+
+    def __init__(self, save_path: str, host: str = '127.0.0.1', port: int = 8080, workers: int = None,
+                 batch_cells: int = 10000, batch_size: int = 32, batch_delay: float = 0.002) -> None:
+        self.__save_path = save_path
+        self.__host = host
+        self.__port = port
+        self.__workers = workers or os.cpu_count() or 1
+        self.__batch_cells = batch_cells
+        self.__batch_size = batch_size
+        self.__batch_delay = batch_delay
+
+        conf_loader = Loader(os.path.join(ROOT_PATH, 'conf'))
+        self.__conf, self.__styles = conf_loader.load_json('conf'), conf_loader.load_json('styles')
+
+        self.__pool = None
+        self.__server = None
+        self.__batch = []
+        self.__flush_handle = None
+        self.__connections = {}
+
+        self.__routes = {'/generate': self.__generate, '/solve': self.__solve,
+                         '/load': self.__load, '/render': self.__render}
+
+    @property
+    def port(self) -> int:
+        """Port the service listens on, it is picked by the system if 0 was given"""
+        return self.__server.sockets[0].getsockname()[1] if self.__server else self.__port
+
+    async def start(self) -> None:
+        self.__pool = ProcessPoolExecutor(self.__workers)
+        self.__server = await asyncio.start_server(self.__handle, self.__host, self.__port)
+
+    async def serve_forever(self) -> None:
+        await self.__server.serve_forever()
+
+    async def close(self) -> None:
+        self.__server.close()
+
+        """Idle keep-alive connections are closed, so their handlers finish before the loop stops"""
+        for writer in list(self.__connections):
+            writer.close()
+
+        await asyncio.gather(*self.__connections.values(), return_exceptions=True)
+        await self.__server.wait_closed()
+        self.__pool.shutdown()
+
+    def __flush(self) -> None:
+        """Sends collected small jobs to a worker as one batch"""
+        if self.__flush_handle is not None:
+            self.__flush_handle.cancel()
+            self.__flush_handle = None
+
+        jobs, self.__batch = self.__batch, []
+        done = asyncio.get_running_loop().run_in_executor(self.__pool, run_batch,
+                                                          [(function, args) for function, args, _ in jobs])
+
+        def resolve(batch: asyncio.Future) -> None:
+            """Failure of the whole worker call is the only one fanned out to every job of the batch"""
+            for (_, _, future), (status, result) in zip(jobs, batch.result() if not batch.exception()
+                                                        else [(500, repr(batch.exception()))] * len(jobs)):
+                if future.done():
+                    continue
+
+                if status == 200:
+                    future.set_result(result)
+                else:
+                    future.set_exception(ValueError(result) if status == 400 else WorkerError(result))
+
+        done.add_done_callback(resolve)
+
+    async def __submit(self, cells: int | None, function: Callable, *args) -> Any:
+        """Runs job in the process pool, jobs of known small size are batched"""
+        loop = asyncio.get_running_loop()
+
+        if cells is None or cells > self.__batch_cells:
+            return await loop.run_in_executor(self.__pool, function, *args)
+
+        future = loop.create_future()
+        self.__batch.append((function, args, future))
+
+        if len(self.__batch) >= self.__batch_size:
+            self.__flush()
+        elif self.__flush_handle is None:
+            self.__flush_handle = loop.call_later(self.__batch_delay, self.__flush)
+
+        return await future
+
+    @staticmethod
+    def __get_cells(request: dict) -> int | None:
+        """Returns number of cells of the requested labyrinth or None if it is not known without loading"""
+        data = request.get('labyrinth', request)
+
+        try:
+            return int(data['width']) * int(data['height'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    async def __generate(self, request: dict) -> tuple[str, Any]:
+        if int(request.get('width', 0)) <= 0 or int(request.get('height', 0)) <= 0:
+            raise ValueError('Dimensions must be positive')
+
+        return 'json', await self.__submit(self.__get_cells(request), run_generate, request, self.__save_path)
+
+    async def __solve(self, request: dict) -> tuple[str, Any]:
+        if request.get('strategy', 'bfs') not in Solver.strategies:
+            raise ValueError(f'No such solving strategy: {request.get("strategy")}')
+
+        return 'json', await self.__submit(self.__get_cells(request), run_solve, request, self.__save_path)
+
+    async def __load(self, request: dict) -> tuple[str, Any]:
+        return 'json', await self.__submit(None, run_load, request, self.__save_path)
+
+    async def __render(self, request: dict) -> tuple[str, Any]:
+        return 'text', await self.__submit(self.__get_cells(request), run_render, request, self.__save_path,
+                                           self.__conf, self.__styles)
+
+    async def __dispatch(self, method: str, path: str, body: bytes) -> tuple[int, str, Any]:
+        """Returns status, content kind and payload of response to the request"""
+        if path == '/health':
+            return 200, 'json', {'status': 'ok', 'workers': self.__workers}
+
+        if path not in self.__routes:
+            return 404, 'json', {'error': f'No such endpoint: {path}'}
+
+        if method != 'POST':
+            return 405, 'json', {'error': 'Only POST is allowed'}
+
+        try:
+            request = json.loads(body or b'{}')
+
+            if not isinstance(request, dict):
+                raise ValueError('Request body must be a JSON object')
+
+            kind, payload = await self.__routes[path](request)
+        except (KeyError, TypeError, ValueError) as err:
+            return 400, 'json', {'error': str(err)}
+        except WorkerError as err:
+            return 500, 'json', {'error': str(err)}
+
+        return 200, kind, payload
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves HTTP/1.1 requests of one connection, connection is kept alive unless client closes it"""
+        self.__connections[writer] = asyncio.current_task()
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, *_ = request_line.decode('latin-1').split() + ['', '']
+                headers = {}
+
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+
+                if length > self.max_body:
+                    status, kind, payload = 413, 'json', {'error': 'Request body is too large'}
+                    headers['connection'] = 'close'
+                else:
+                    body = await reader.readexactly(length)
+
+                    try:
+                        status, kind, payload = await self.__dispatch(method, path.split('?')[0], body)
+                    except Exception as err:
+                        status, kind, payload = 500, 'json', {'error': repr(err)}
+
+                content = (json.dumps(payload) if kind == 'json' else payload).encode('utf-8')
+                content_type = 'application/json' if kind == 'json' else 'text/plain; charset=utf-8'
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                writer.write(f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n'
+                             f'Content-Type: {content_type}\r\nContent-Length: {len(content)}\r\n'
+                             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1')
+                             + content)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.__connections.pop(writer, None)
+            writer.close()
+
+
+async def serve(service: LabService) -> None:
+    await service.start()
+    print(f'Labyrinth service is listening on port {service.port}', flush=True)
+
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.service', description='Local labyrinth service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, help='worker processes, CPU count by default')
+    parser.add_argument('--maps', default=os.path.join(ROOT_PATH, 'maps'), help='saves directory')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(LabService(args.maps, args.host, args.port, args.workers)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""This module contains opt-in instrumentation of labyrinth operations"""
+
+from contextlib import nullcontext
+from time import perf_counter
+
+
+class Phase:
+    """Context adding its running time to the phase of the statistics"""
+    __slots__ = ('stats', 'name', 'begin')
+
+    def __init__(self, stats: 'Stats', name: str) -> None:
+        self.stats = stats
+        self.name = name
+        self.begin = 0.0
+
+    def __enter__(self) -> 'Phase':
+        self.begin = perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        phases = self.stats.phases
+        phases[self.name] = phases.get(self.name, 0.0) + perf_counter() - self.begin
+
+
+class Stats:
+    """
+        Class collecting phase timings and counters of the last operation
+        Disabled statistics hand out one shared no-op context and ignore counters,
+        so instrumented code pays for a single attribute check per phase
+        Hot loops keep their counters in local variables and report them once
+    """
+    __disabled = nullcontext()
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.operation = None
+        self.phases = {}
+        self.counters = {}
+
+    def reset(self, operation: str) -> None:
+        """Forgets collected data and starts collecting it for the new operation"""
+        self.operation = operation
+        self.phases = {}
+        self.counters = {}
+
+    def phase(self, name: str) -> Phase | nullcontext:
+        """Returns context measuring the named phase"""
+        return Phase(self, name) if self.enabled else self.__disabled
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Adds value to the named counter"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def peak(self, name: str, value: int) -> None:
+        """Keeps maximum of the named counter and value"""
+        if self.enabled:
+            self.counters[name] = max(self.counters.get(name, value), value)
+
+    def report(self) -> str:
+        """Returns collected data as text table"""
+        if self.operation is None:
+            return 'No operation was recorded'
+
+        lines = [f'Operation: {self.operation}']
+        total = sum(self.phases.values())
+
+        for name, seconds in self.phases.items():
+            lines.append(f'  {name:<20} {seconds * 1000:>10.3f} ms {seconds / total if total else 0:>7.1%}')
+
+        for name, value in self.counters.items():
+            lines.append(f'  {name:<20} {value:>10}')
+
+        return '\n'.join(lines)
+
+
+"""Statistics shared by all instrumented modules"""
+stats = Stats()
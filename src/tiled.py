@@ -0,0 +1,139 @@
+"""This module contains tiled parallel generation of huge labyrinths"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from .batch import derive_seed
+from .entities import Grid
+from .entities import Labyrinth
+from .generator import Generator
+from .rng import RandomBuffer
+from .stats import stats
+
+
+def generate_tile(generator: type[Generator], width: int, height: int, seed: int) -> tuple[str, bytes]:
+    """Generates single tile and returns its algo and walls with closed outer borders, runs inside worker process"""
+    labyrinth = generator(width, height, seed).generate()
+    grid = labyrinth.field if isinstance(labyrinth.field, Grid) else Grid.from_field(labyrinth.field)
+
+    return labyrinth.algo, bytes(grid.sealed_walls())
+
+
+class TiledGenerator(Generator):
+    """
+        Class generating huge Labyrinth instances from tiles generated in a process pool by any generator
+        Every tile is a perfect labyrinth closed from outside, tiles are stitched by a random spanning tree
+        of the tile graph opening exactly one seam wall per tree edge, so the result is a perfect labyrinth too
+        Start is picked in the top row and finish in a dead end of the whole labyrinth
+    """
+
+    def __init__(self, generator: type[Generator], width: int, height: int, seed: int = None,
+                 tile_size: int = 256, workers: int = None, finish: str = 'random') -> None:
+        if tile_size <= 1:
+            raise ValueError('Tile size must be greater than one')
+
+        if workers is not None and workers <= 0:
+            raise ValueError('Workers count must be positive')
+
+        super().__init__(width, height, seed, finish)
+        self.__generator = generator
+        self.__tile_size = tile_size
+        self.__workers = workers or os.cpu_count() or 1
+
+    @property
+    def tile_size(self) -> int:
+        return self.__tile_size
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @staticmethod
+    def __split(length: int, tile_size: int) -> list[int]:
+        """Splits length into bounds of nearly equal parts about tile size long, parts are at least two cells long"""
+        count = max(1, min(-(-length // tile_size), length // 2))
+
+        return [length * i // count for i in range(count + 1)]
+
+    def __get_seams(self, columns: int, rows: int, rng: RandomBuffer) -> list[tuple[int, int, int]]:
+        """Returns (tile x, tile y, wall) seams of random spanning tree over tiles via randomized Kruskal"""
+        edges = [(x, y, Grid.RIGHT) for x in range(columns - 1) for y in range(rows)] \
+            + [(x, y, Grid.BOTTOM) for x in range(columns) for y in range(rows - 1)]
+        parent = list(range(columns * rows))
+        seams = []
+
+        def find(tile: int) -> int:
+            while parent[tile] != tile:
+                parent[tile] = parent[parent[tile]]
+                tile = parent[tile]
+
+            return tile
+
+        for i in range(len(edges) - 1, 0, -1):
+            j = rng.below(i + 1)
+            edges[i], edges[j] = edges[j], edges[i]
+
+        for x, y, wall in edges:
+            first, second = find(x * rows + y), find((x + 1) * rows + y if wall == Grid.RIGHT else x * rows + y + 1)
+
+            if first != second:
+                parent[second] = first
+                seams.append((x, y, wall))
+
+        return seams
+
+    def generate(self) -> Labyrinth:
+        """Generate Labyrinth by generating tiles in parallel and stitching them"""
+        if self._width * self._height < 2:
+            raise ValueError('Labyrinth must contain at least two cells')
+
+        seed = self._next_seed()
+        rng = RandomBuffer(seed)
+
+        x_bounds, y_bounds = self.__split(self._width, self.__tile_size), self.__split(self._height, self.__tile_size)
+        tiles = [(x, y) for x in range(len(x_bounds) - 1) for y in range(len(y_bounds) - 1)]
+        sizes = [(x_bounds[x + 1] - x_bounds[x], y_bounds[y + 1] - y_bounds[y]) for x, y in tiles]
+        tasks = ([self.__generator] * len(tiles), [width for width, _ in sizes], [height for _, height in sizes],
+                 [derive_seed(seed, number) for number in range(len(tiles))])
+
+        with stats.phase('allocation'):
+            grid = Grid(self._width, self._height)
+
+        algo = None
+        parallel = self.__workers > 1 and len(tiles) > 1
+
+        with stats.phase('carving'), \
+                ProcessPoolExecutor(min(self.__workers, len(tiles))) if parallel else nullcontext() as executor:
+            if parallel:
+                results = executor.map(generate_tile, *tasks, chunksize=max(1, len(tiles) // (self.__workers * 4)))
+            else:
+                results = map(generate_tile, *tasks)
+
+            """Tile columns are contiguous in both tile and labyrinth walls, so tiles are copied column by column"""
+            for (x, y), (width, height), (algo, walls) in zip(tiles, sizes, results):
+                for column in range(width):
+                    begin = (x_bounds[x] + column) * self._height + y_bounds[y]
+                    grid.walls[begin:begin + height] = walls[column * height:(column + 1) * height]
+
+        with stats.phase('stitching'):
+            for x, y, wall in self.__get_seams(len(x_bounds) - 1, len(y_bounds) - 1, rng):
+                if wall == Grid.RIGHT:
+                    cell = (x_bounds[x + 1] - 1, y_bounds[y] + rng.below(y_bounds[y + 1] - y_bounds[y]))
+                else:
+                    cell = (x_bounds[x] + rng.below(x_bounds[x + 1] - x_bounds[x]), y_bounds[y + 1] - 1)
+
+                grid.carve(grid.index(cell), wall)
+
+        with stats.phase('finish selection'):
+            start_cell = (rng.below(self._width), 0)
+            start_index = grid.index(start_cell)
+            grid.walls[start_index] &= ~Grid.TOP
+            grid.types[start_index] = 1
+
+            finish_index = self._pick_finish(grid, start_index, rng)
+            grid.types[finish_index] = 2
+
+        stats.count('tiles', len(tiles))
+
+        return Labyrinth(f'{algo}-tiled', grid, self._width, self._height, start_cell, grid.coords(finish_index), seed)
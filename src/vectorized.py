@@ -0,0 +1,97 @@
+"""This module contains generating algorithms working on whole wall arrays via NumPy"""
+
+import numpy as np
+
+from .entities import Grid
+from .entities import Labyrinth
+from .generator import Generator
+
+"""Number of walls for every wall flags combination"""
+WALL_COUNT = np.array([bin(walls).count('1') for walls in range(Grid.ALL + 1)], dtype=np.uint8)
+
+
+class VectorizedGenerator(Generator):
+    """
+        Base class for generators carving whole wall array at once
+        Wall arrays are shaped (width, height), so their flat layout matches Grid indexing
+    """
+    algo: str = None
+
+    def _carve(self, rng: np.random.Generator) -> np.ndarray:
+        """Returns carved wall array"""
+        pass
+
+    def generate(self) -> Labyrinth:
+        """Generate Labyrinth by carving wall array, picks start in top row and finish in dead end"""
+        seed = self._next_seed()
+        rng = np.random.default_rng(seed)
+        walls = self._carve(rng)
+
+        start_cell = (int(rng.integers(self._width)), 0)
+        walls[start_cell] -= np.uint8(Grid.TOP)
+
+        grid = Grid(self._width, self._height, bytearray(walls.tobytes()))
+
+        if self._finish == 'random':
+            dead_ends = np.flatnonzero(WALL_COUNT[walls] == 3)
+            finish_index = int(dead_ends[rng.integers(len(dead_ends))])
+        else:
+            finish_index = self._pick_finish(grid, grid.index(start_cell), None)
+
+        grid.types[grid.index(start_cell)] = 1
+        grid.types[finish_index] = 2
+
+        return Labyrinth(self.algo, grid, self._width, self._height, start_cell, grid.coords(finish_index), seed)
+
+
+class BinaryTreeGenerator(VectorizedGenerator):
+    """Class generating Labyrinth instances via binary tree algorithm, every cell carves either top or left"""
+    algo = 'binary'
+
+    def _carve(self, rng: np.random.Generator) -> np.ndarray:
+        walls = np.full((self._width, self._height), Grid.ALL, dtype=np.uint8)
+
+        """Top row can only carve left, left column can only carve top"""
+        top = rng.random((self._width, self._height)) < 0.5
+        top[:, 0] = False
+        top[0, 1:] = True
+
+        left = ~top
+        left[0, :] = False
+
+        walls -= top * np.uint8(Grid.TOP) + left * np.uint8(Grid.LEFT)
+        walls[:, :-1] -= top[:, 1:] * np.uint8(Grid.BOTTOM)
+        walls[:-1, :] -= left[1:, :] * np.uint8(Grid.RIGHT)
+
+        return walls
+
+
+class SidewinderGenerator(VectorizedGenerator):
+    """
+        Class generating Labyrinth instances via sidewinder algorithm
+        Rows are split into runs carved to the right, every run carves top from one random cell
+    """
+    algo = 'sidewinder'
+
+    def _carve(self, rng: np.random.Generator) -> np.ndarray:
+        walls = np.full((self._width, self._height), Grid.ALL, dtype=np.uint8)
+
+        """Top row is a single run, every row ends its last run at the right border"""
+        right = rng.random((self._width, self._height)) < 0.5
+        right[:, 0] = True
+        right[-1, :] = False
+
+        walls[:-1, :] -= right[:-1, :] * np.uint8(Grid.RIGHT)
+        walls[1:, :] -= right[:-1, :] * np.uint8(Grid.LEFT)
+
+        if self._height > 1:
+            """Runs of rows below the top one in row-major order, they never cross row borders"""
+            run_ends = np.flatnonzero(~right[:, 1:].T.ravel())
+            run_starts = np.concatenate(([0], run_ends[:-1] + 1))
+            carved = run_starts + (rng.random(len(run_ends)) * (run_ends - run_starts + 1)).astype(np.int64)
+
+            carved_y, carved_x = np.divmod(carved, self._width)
+            walls[carved_x, carved_y + 1] -= np.uint8(Grid.TOP)
+            walls[carved_x, carved_y] -= np.uint8(Grid.BOTTOM)
+
+        return walls
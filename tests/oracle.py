@@ -0,0 +1,54 @@
+"""This module contains plain BFS oracles the tests compare fast structures against"""
+
+from collections import deque
+
+from src.entities import Grid
+
+
+def moves(walls: bytes, height: int, index: int) -> list[int]:
+    """Takes sealed walls, returns indices of cells reachable from the cell in one step"""
+    return [index + offset for wall, offset in ((Grid.TOP, -1), (Grid.BOTTOM, 1), (Grid.LEFT, -height),
+                                                (Grid.RIGHT, height)) if not walls[index] & wall]
+
+
+def distances(grid: Grid, source: int) -> dict[int, int]:
+    """Returns BFS distances in steps from the source cell to every reachable cell"""
+    walls, result, queue = bytes(grid.sealed_walls()), {source: 0}, deque([source])
+
+    while queue:
+        index = queue.popleft()
+
+        for next_index in moves(walls, grid.height, index):
+            if next_index not in result:
+                result[next_index] = result[index] + 1
+                queue.append(next_index)
+
+    return result
+
+
+def components(grid: Grid) -> int:
+    """Returns number of connected components of the grid"""
+    seen, count = set(), 0
+
+    for index in range(len(grid.walls)):
+        if index not in seen:
+            seen |= distances(grid, index).keys()
+            count += 1
+
+    return count
+
+
+def loops(grid: Grid) -> int:
+    """Returns number of independent loops: open inner walls minus cells plus components"""
+    walls = bytes(grid.sealed_walls())
+    open_walls = sum(not cell & Grid.RIGHT for cell in walls) + sum(not cell & Grid.BOTTOM for cell in walls)
+
+    return open_walls - len(walls) + components(grid)
+
+
+def is_path(grid: Grid, cells: list[tuple[int, int]]) -> bool:
+    """Checks that every two consecutive cells are neighbours without a wall between them"""
+    walls = bytes(grid.sealed_walls())
+
+    return all(grid.index(second) in moves(walls, grid.height, grid.index(first))
+               for first, second in zip(cells, cells[1:]))
@@ -0,0 +1,72 @@
+"""Tests of LabyrinthEditor connectivity and cached path against BFS"""
+
+import random
+
+import pytest
+
+from src.editor import LabyrinthEditor
+from src.entities import Grid
+from src.generator import DFSGenerator
+from src.generator import PrimGenerator
+from src.generator import WilsonGenerator
+from tests.oracle import components
+from tests.oracle import distances
+from tests.oracle import is_path
+from tests.oracle import loops
+
+SIDES = {'top': Grid.TOP, 'bottom': Grid.BOTTOM, 'left': Grid.LEFT, 'right': Grid.RIGHT}
+
+
+def random_edit(editor: LabyrinthEditor, rng: random.Random):
+    """Applies one random edit, edits of outer walls and start on finish are rejected by the editor"""
+    grid = editor.labyrinth.field
+    x, y = rng.randrange(grid.width), rng.randrange(grid.height)
+
+    try:
+        match rng.choice(('open', 'open', 'close', 'close', 'start', 'finish')):
+            case 'open':
+                return editor.open_wall((x, y), rng.choice(tuple(SIDES)))
+            case 'close':
+                return editor.close_wall((x, y), rng.choice(tuple(SIDES)))
+            case 'start':
+                return editor.move_start(x)
+            case 'finish':
+                return editor.move_finish((x, y))
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize('generator', (DFSGenerator, WilsonGenerator, PrimGenerator),
+                         ids=lambda generator: generator.__name__)
+@pytest.mark.parametrize('seed', range(4))
+def test_edits_match_bfs(generator, seed):
+    rng = random.Random(seed)
+    labyrinth = generator(rng.randint(2, 12), rng.randint(2, 12), seed).generate()
+    editor, grid = LabyrinthEditor(labyrinth), labyrinth.field
+
+    for _ in range(150):
+        was_solvable = editor.solvable
+        result = random_edit(editor, rng)
+
+        start, finish = grid.index(labyrinth.start_cell), grid.index(labyrinth.finish_cell)
+        distance = distances(grid, start).get(finish)
+
+        assert editor.components == components(grid)
+        assert editor.loops == loops(grid)
+        assert editor.solvable == (distance is not None)
+
+        if result is not None:
+            assert result.solvable == editor.solvable
+            assert result.loops == editor.loops
+            assert result.broke_solution == (was_solvable and not editor.solvable)
+
+        """Path is requested after most edits, so splicing of the cached path is exercised too"""
+        if distance is not None and rng.random() < 0.8:
+            path = list(editor.solution())
+
+            assert len(path) == distance + 1
+            assert path[0] == labyrinth.start_cell and path[-1] == labyrinth.finish_cell
+            assert is_path(grid, path)
+        elif distance is None:
+            with pytest.raises(ValueError):
+                editor.solution()
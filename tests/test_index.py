@@ -0,0 +1,48 @@
+"""Tests of TreeIndex path queries against BFS"""
+
+import random
+
+import pytest
+
+from src.entities import Grid
+from src.generator import DFSGenerator
+from src.generator import EllerGenerator
+from src.generator import PrimGenerator
+from src.generator import WilsonGenerator
+from src.index import TreeIndex
+from tests.oracle import distances
+from tests.oracle import is_path
+
+GENERATORS = (DFSGenerator, WilsonGenerator, PrimGenerator, EllerGenerator)
+
+
+@pytest.mark.parametrize('generator', GENERATORS, ids=lambda generator: generator.__name__)
+@pytest.mark.parametrize('seed', range(4))
+def test_queries_match_bfs(generator, seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 25), rng.randint(2, 25)
+    labyrinth = generator(width, height, seed).generate()
+    grid, index = labyrinth.field, TreeIndex(labyrinth)
+
+    for _ in range(40):
+        first = (rng.randrange(width), rng.randrange(height))
+        second = (rng.randrange(width), rng.randrange(height))
+        distance = distances(grid, grid.index(first))[grid.index(second)]
+        path = list(index.path(first, second))
+
+        assert index.distance(first, second) == distance
+        assert len(path) == distance + 1
+        assert path[0] == first and path[-1] == second
+        assert is_path(grid, path)
+
+
+def test_rejects_labyrinth_with_loop():
+    labyrinth = DFSGenerator(6, 6, 1).generate()
+    grid = labyrinth.field
+
+    """Any closed right wall outside the last column is inner, opening it makes a loop"""
+    closed = next(index for index in range(len(grid.walls) - grid.height) if grid.walls[index] & Grid.RIGHT)
+    grid.carve(closed, Grid.RIGHT)
+
+    with pytest.raises(ValueError):
+        TreeIndex(labyrinth)